@@ -48,6 +48,11 @@ class AnalysisConfiguration(base_configuration.XmlBase):
             else:
                 self.interpolationMode = 'Linear'
 
+            if self.nodeExists(configurationNode, 'ParallelLoading'):
+                self.parallelLoading = self.getNodeBool(configurationNode, 'ParallelLoading')
+            else:
+                self.parallelLoading = False
+
             self.powerCurveMode = self.getNodeValue(configurationNode, 'PowerCurveMode')
             self.powerCurvePaddingMode = self.getNodeValueIfExists(configurationNode, 'PowerCurvePaddingMode', defaultPaddingMode)
             
@@ -98,14 +103,17 @@ class AnalysisConfiguration(base_configuration.XmlBase):
             self.rewsExponent = 3.0
 
             self.turbRenormActive = False
+            self.setDefaultTurbRenormLookup()
             self.densityCorrectionActive = False
             self.powerDeviationMatrixActive = False
+            self.power_deviation_matrix_interpolation_mode = 'Bin'
             self.productionByHeightActive = False
 
             self.web_service_active = False
             self.web_service_url = ''
             
             self.interpolationMode = 'Cubic'
+            self.parallelLoading = False
             self.calculated_power_deviation_matrix_dimensions = self.default_calculated_power_deviation_matrix_dimensions()
             self.power_deviation_matrix_minimum_count = 0
             self.power_deviation_matrix_method = 'Average of Deviations'
@@ -143,6 +151,11 @@ class AnalysisConfiguration(base_configuration.XmlBase):
 
         return dimensions
         
+    def setDefaultTurbRenormLookup(self):
+        self.turbRenormLookupActive = False
+        self.turbRenormLookupWindSpeedStep = 0.1
+        self.turbRenormLookupTurbulenceStep = 0.005
+
     def setDefaultInnerRangeTurbulence(self):
         self.innerRangeLowerTurbulence = 0.08
         self.innerRangeUpperTurbulence = 0.12
@@ -175,6 +188,7 @@ class AnalysisConfiguration(base_configuration.XmlBase):
         self.addTextNode(doc, root, 'NegativePowerBinAverageTreatment', self.negative_power_bin_average_treatment)
                 
         self.addTextNode(doc, root, "InterpolationMode", self.interpolationMode)
+        self.addBoolNode(doc, root, "ParallelLoading", self.parallelLoading)
         self.addTextNode(doc, root, "PowerCurveMode", self.powerCurveMode)
         self.addTextNode(doc, root, "PowerCurvePaddingMode", self.powerCurvePaddingMode)
         self.addTextNode(doc, root, "NominalWindSpeedDistribution", self.nominal_wind_speed_distribution.relative_path)
@@ -206,6 +220,11 @@ class AnalysisConfiguration(base_configuration.XmlBase):
         turbulenceRenormNode = self.addNode(doc, root, "TurbulenceRenormalisation")
         self.addBoolNode(doc, turbulenceRenormNode, "Active", self.turbRenormActive)
 
+        turbulenceRenormLookupNode = self.addNode(doc, turbulenceRenormNode, "LookupTable")
+        self.addBoolNode(doc, turbulenceRenormLookupNode, "Active", self.turbRenormLookupActive)
+        self.addFloatNode(doc, turbulenceRenormLookupNode, "WindSpeedStep", self.turbRenormLookupWindSpeedStep)
+        self.addFloatNode(doc, turbulenceRenormLookupNode, "TurbulenceStep", self.turbRenormLookupTurbulenceStep)
+
         rewsNode = self.addNode(doc, root, "RotorEquivalentWindSpeed")
 
         self.addBoolNode(doc, rewsNode, "Active", self.rewsActive)
@@ -216,6 +235,7 @@ class AnalysisConfiguration(base_configuration.XmlBase):
         powerDeviationMatrixNode = self.addNode(doc, root, "PowerDeviationMatrix")
         self.addTextNode(doc, powerDeviationMatrixNode, "SpecifiedPowerDeviationMatrix", self.specified_power_deviation_matrix.relative_path)
         self.addBoolNode(doc, powerDeviationMatrixNode, "Active", self.powerDeviationMatrixActive)
+        self.addTextNode(doc, powerDeviationMatrixNode, "InterpolationMode", self.power_deviation_matrix_interpolation_mode)
 
         calculatedPowerDeviationMatrixNode = self.addNode(doc, powerDeviationMatrixNode, "CalculatedPowerDeviationMatrix")
 
@@ -289,6 +309,7 @@ class AnalysisConfiguration(base_configuration.XmlBase):
             
             self.powerDeviationMatrixActive = self.getNodeBool(powerDeviationMatrixNode, 'Active')
             self.specified_power_deviation_matrix.relative_path = self.getNodeValue(powerDeviationMatrixNode, 'SpecifiedPowerDeviationMatrix')
+            self.power_deviation_matrix_interpolation_mode = self.getNodeValueIfExists(powerDeviationMatrixNode, 'InterpolationMode', 'Bin')
 
             if self.nodeExists(powerDeviationMatrixNode, 'CalculatedPowerDeviationMatrix'):
                 
@@ -321,6 +342,7 @@ class AnalysisConfiguration(base_configuration.XmlBase):
             self.power_deviation_matrix_minimum_count = self.powerCurveMinimumCount
             self.powerDeviationMatrixActive = False
             self.specified_power_deviation_matrix.relative_path = None
+            self.power_deviation_matrix_interpolation_mode = 'Bin'
             self.calculated_power_deviation_matrix_dimensions = self.default_calculated_power_deviation_matrix_dimensions()
             self.power_deviation_matrix_method = 'Average of Deviations'
 
@@ -378,9 +400,19 @@ class AnalysisConfiguration(base_configuration.XmlBase):
             
     def readTurbRenorm(self, configurationNode):
 
+        self.setDefaultTurbRenormLookup()
+
         if self.nodeExists(configurationNode, 'TurbulenceRenormalisation'):
+            
             turbulenceNode = self.getNode(configurationNode, 'TurbulenceRenormalisation')
             self.turbRenormActive = self.getNodeBool(turbulenceNode, 'Active')
+
+            if self.nodeExists(turbulenceNode, 'LookupTable'):
+                lookupNode = self.getNode(turbulenceNode, 'LookupTable')
+                self.turbRenormLookupActive = self.getNodeBool(lookupNode, 'Active')
+                self.turbRenormLookupWindSpeedStep = self.getNodeFloat(lookupNode, 'WindSpeedStep')
+                self.turbRenormLookupTurbulenceStep = self.getNodeFloat(lookupNode, 'TurbulenceStep')
+
         else:
             self.turbRenormActive = False
 
@@ -187,6 +187,8 @@ class TimeOfDayFilter(XmlBase):
         self.endTime = endTime
         self.daysOfTheWeek = daysOfTheWeek
         self.applied = False
+        self.removedAlone = None
+        self.removedIncrementally = None
         self.months  = months
         self.column = "TimeStamp"
         self.filterType = "Time of Day"
@@ -211,6 +213,8 @@ class Filter(XmlBase):
         self.inclusive = inclusive
         self.value = value
         self.applied = False
+        self.removedAlone = None
+        self.removedIncrementally = None
 
     def write_summary(self):
 
@@ -248,6 +252,8 @@ class RelationshipFilter(XmlBase):
     def __init__(self, active,  conjunction, filters):
         self.active = active
         self.applied = False
+        self.removedAlone = None
+        self.removedIncrementally = None
         self.conjunction = conjunction
         self.clauses = filters
         self.sortClauses()
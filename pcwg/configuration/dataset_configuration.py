@@ -139,6 +139,7 @@ class DatasetConfiguration(base_configuration.XmlBase):
             self.badData = -99.99
             self.timeStepInSeconds = 600
             self.dateFormat = '%Y-%m-%d %H:%M:%S'
+            self.timeStampAtEndOfPeriod = False
             self.separator = "TAB"
             self.decimal = "FULL STOP"
             self.headerRows = 0
@@ -153,6 +154,7 @@ class DatasetConfiguration(base_configuration.XmlBase):
             self.hubTurbulence = ''
             self.temperature = ''
             self.pressure = ''
+            self.humidity = ''
             self.power = ''
             self.powerMin = ''
             self.powerMax = ''
@@ -317,6 +319,7 @@ class DatasetConfiguration(base_configuration.XmlBase):
             self.addTextNode(doc, measurementsNode, "BadDataValue", self.badData)
 
         self.addTextNode(doc, measurementsNode, "DateFormat", self.dateFormat)
+        self.addBoolNode(doc, measurementsNode, "TimeStampAtEndOfPeriod", self.timeStampAtEndOfPeriod)
         self.addTextNode(doc, measurementsNode, "Separator", self.separator)
         self.addTextNode(doc, measurementsNode, "Decimal", self.decimal)
         self.addIntNode(doc, measurementsNode, "HeaderRows", self.headerRows)
@@ -330,6 +333,7 @@ class DatasetConfiguration(base_configuration.XmlBase):
 
         self.addTextNode(doc, measurementsNode, "Temperature", self.temperature)
         self.addTextNode(doc, measurementsNode, "Pressure", self.pressure)
+        self.addTextNode(doc, measurementsNode, "Humidity", self.humidity)
         self.addTextNode(doc, measurementsNode, "Density", self.density)
         self.addTextNode(doc, measurementsNode, "InflowAngle", self.inflowAngle)
 
@@ -589,6 +593,12 @@ class DatasetConfiguration(base_configuration.XmlBase):
         self.input_time_series.relative_path = self.getNodePath(measurementsNode, 'InputTimeSeriesPath')
 
         self.dateFormat = self.getNodeValue(measurementsNode, 'DateFormat')
+
+        if self.nodeExists(measurementsNode, 'TimeStampAtEndOfPeriod'):
+            self.timeStampAtEndOfPeriod = self.getNodeBool(measurementsNode, 'TimeStampAtEndOfPeriod')
+        else:
+            self.timeStampAtEndOfPeriod = False
+
         self.timeStepInSeconds = self.getNodeInt(measurementsNode, 'TimeStepInSeconds')
 
         self.timeStamp = self.getNodeValue(measurementsNode, 'TimeStamp')
@@ -610,6 +620,7 @@ class DatasetConfiguration(base_configuration.XmlBase):
 
         self.temperature = self.getNodeValueIfExists(measurementsNode, 'Temperature', '')
         self.pressure = self.getNodeValueIfExists(measurementsNode, 'Pressure', '')
+        self.humidity = self.getNodeValueIfExists(measurementsNode, 'Humidity', '')
         self.inflowAngle = self.getNodeValueIfExists(measurementsNode, 'InflowAngle', '')
 
         if self.calculateDensity:
@@ -1,4 +1,7 @@
 
+import itertools
+import numpy as np
+
 import base_configuration
 from ..core.status import Status
 
@@ -27,9 +30,9 @@ class PowerDeviationMatrixConfiguration(base_configuration.XmlBase):
                 parameter = self.getNodeValue(node, 'Parameter')
                 centerOfFirstBin = self.getNodeFloat(node, 'CenterOfFirstBin')
                 binWidth = self.getNodeFloat(node, 'BinWidth')
-                numberOfBins = self.getNodeFloat(node, 'NumberOfBins')
+                numberOfBins = self.getNodeInt(node, 'NumberOfBins')
 
-                self.dimensions.append(PowerDeviationMatrixDimension(parameter, centerOfFirstBin, binWidth, numberOfBins))
+                self.dimensions.append(PowerDeviationMatrixDimension(parameter, len(self.dimensions) + 1, centerOfFirstBin, binWidth, numberOfBins))
 
             if len(self.dimensions) < 1:
                 raise Exception("Matrix has zero dimensions")
@@ -63,6 +66,8 @@ class PowerDeviationMatrixConfiguration(base_configuration.XmlBase):
 
                 self.cells[key] = value
 
+            self.compile()
+
         else:
 
             self.isNew = True
@@ -94,7 +99,7 @@ class PowerDeviationMatrixConfiguration(base_configuration.XmlBase):
 
         cells_node = self.addNode(doc, root, "Cells")
 
-        self.add_cells(doc, cells_node, dimensions, matrix.matrix)
+        self.add_cells(doc, cells_node, dimensions, matrix.deviation_matrix)
         
         self.path = path        
         self.saveDocument(doc, self.path)
@@ -146,39 +151,123 @@ class PowerDeviationMatrixConfiguration(base_configuration.XmlBase):
     def getBin(self, dimension, value):
         return round(round((value - dimension.centerOfFirstBin) / dimension.binWidth, 0) * dimension.binWidth + dimension.centerOfFirstBin, 4)
     
-    def __getitem__(self, parameters):
+    def getBinIndices(self, dimension, values):
+
+        #array equivalent of the bin index used by getBin (rounding half away from zero)
+
+        scaled = (np.asarray(values, dtype=float) - dimension.centerOfFirstBin) / dimension.binWidth
+
+        with np.errstate(invalid = 'ignore'):
+            magnitude = np.abs(scaled)
+            rounded = np.floor(magnitude)
+            rounded += ((magnitude - rounded) >= 0.5)
+
+        return np.copysign(rounded, scaled)
+
+    def compile(self):
+
+        #dense array of cell values indexed by bin (NaN where no cell is defined)
+
+        self.values = np.full([dimension.numberOfBins for dimension in self.dimensions], np.nan)
+
+        for key, value in self.cells.items():
+
+            index = tuple(int(self.getBinIndices(dimension, center)) for dimension, center in zip(self.dimensions, key))
+
+            if all(0 <= i < n for i, n in zip(index, self.values.shape)):
+                self.values[index] = value
+
+    def deviations(self, parameters, interpolate = False):
 
         if len(self.dimensions) < 1:
             raise Exception("Matrix has zero dimensions")
 
-        keyList = []
+        values = [np.atleast_1d(np.asarray(parameters[dimension.parameter], dtype=float)) for dimension in self.dimensions]
 
-        for dimension in self.dimensions:
-        
-            value = parameters[dimension.parameter]
-            
-            binValue = self.getBin(dimension, value)
+        out_of_range = np.zeros(len(values[0]), dtype=bool)
+        indices = []
 
-            if not dimension.withinRange(binValue):
-                return self.outOfRangeValue
-            
-            keyList.append(binValue)
+        for dimension, dimension_values in zip(self.dimensions, values):
 
-        key = tuple(keyList)
+            dimension_indices = self.getBinIndices(dimension, dimension_values)
+            bin_values = np.round(dimension_indices * dimension.binWidth + dimension.centerOfFirstBin, 4)
 
-        if not key in self.cells:
+            with np.errstate(invalid = 'ignore'):
+                out_of_range |= (bin_values < dimension.centerOfFirstBin) | (bin_values > dimension.centerOfLastBin)
 
-            message = "Matrix value not found:\n"
+            indices.append(dimension_indices)
 
-            for dimension in self.dimensions:
-                value = parameters[dimension.parameter]
-                message += "%s: %f (%f) - (%f to %f)\n" % (dimension.parameter, value, self.getBin(dimension, value), dimension.centerOfFirstBin, dimension.centerOfLastBin)
-            
-            Status.add(message)
+        #NaN parameters are treated as in range so they are reported as missing cells
+        lookup = ~out_of_range & ~np.any([np.isnan(dimension_indices) for dimension_indices in indices], axis=0)
+
+        if interpolate:
+            deviations = self.interpolate(values, lookup)
+        else:
+            deviations = np.full(len(lookup), np.nan)
+            deviations[lookup] = self.values[tuple(dimension_indices[lookup].astype(int) for dimension_indices in indices)]
+
+        missing = ~out_of_range & np.isnan(deviations)
+
+        if missing.any():
+            self.raise_missing(dict((dimension.parameter, dimension_values[np.argmax(missing)]) for dimension, dimension_values in zip(self.dimensions, values)))
 
-            raise Exception(message)
+        return np.where(out_of_range, self.outOfRangeValue, deviations)
+
+    def interpolate(self, values, lookup):
+
+        #multilinear interpolation between bin centers (flat beyond the first and last centers)
+
+        lower = []
+        fractions = []
+
+        for dimension, dimension_values, number_of_bins in zip(self.dimensions, values, self.values.shape):
+
+            position = (dimension_values[lookup] - dimension.centerOfFirstBin) / dimension.binWidth
+            dimension_lower = np.floor(position).clip(0, max(number_of_bins - 2, 0))
+
+            lower.append(dimension_lower.astype(int))
+            fractions.append((position - dimension_lower).clip(0.0, 1.0) if number_of_bins > 1 else np.zeros(len(position)))
+
+        deviations = np.zeros(lookup.sum())
+        missing = np.zeros(lookup.sum(), dtype=bool)
+
+        for corner in itertools.product([0, 1], repeat=len(self.dimensions)):
+
+            weight = np.ones(lookup.sum())
+            index = []
+
+            for offset, dimension_lower, fraction, number_of_bins in zip(corner, lower, fractions, self.values.shape):
+                weight *= fraction if offset == 1 else (1.0 - fraction)
+                index.append(np.minimum(dimension_lower + offset, number_of_bins - 1))
+
+            corner_values = self.values[tuple(index)]
+            used = weight > 0.0
+
+            missing |= used & np.isnan(corner_values)
+            deviations += np.where(used, weight * corner_values, 0.0)
+
+        deviations[missing] = np.nan
+
+        result = np.full(len(lookup), np.nan)
+        result[lookup] = deviations
+
+        return result
+
+    def raise_missing(self, parameters):
+
+        message = "Matrix value not found:\n"
+
+        for dimension in self.dimensions:
+            value = parameters[dimension.parameter]
+            message += "%s: %f (%f) - (%f to %f)\n" % (dimension.parameter, value, self.getBin(dimension, value), dimension.centerOfFirstBin, dimension.centerOfLastBin)
         
-        return self.cells[key]
+        Status.add(message)
+
+        raise Exception(message)
+
+    def __getitem__(self, parameters):
+
+        return float(self.deviations(parameters)[0])
 
 class PowerDeviationMatrixDimension(object):
 
@@ -1,8 +1,9 @@
 import numpy as np
 import pandas as pd
-import hashlib
 import random
 import datetime
+import multiprocessing
+import traceback
 
 from ..configuration.power_curve_configuration import PowerCurveConfiguration
 from ..configuration.dataset_configuration import DatasetConfiguration
@@ -10,6 +11,7 @@ from ..configuration.power_deviation_matrix_configuration import PowerDeviationM
 
 import dataset
 import binning
+import file_hash
 import turbine
 
 from power_deviation_matrix import AverageOfDeviationsMatrix
@@ -23,9 +25,22 @@ from ..reporting import reporting
 from ..core.status import Status
 
 def hash_file_contents(file_path):
-    with open(file_path, 'r') as f:
-        uid = hashlib.sha1(''.join(f.read().split())).hexdigest()
-    return uid
+    #sha1 of the contents without whitespace, streamed and memoised by path, size and modification time
+    return file_hash.file_digests(file_path)[1]
+
+def load_dataset_in_worker(arguments):
+
+    #runs in a worker process: the loaded dataset (which carries its copy of the configuration,
+    #including the filter results) is returned with the collected status messages
+    dataset_config, analysis_config, verbosity = arguments
+
+    messages = []
+    Status.initialize_status(lambda message, red: messages.append((message, red)), verbosity)
+
+    try:
+        return dataset.Dataset(dataset_config, analysis_config), messages, None
+    except Exception:
+        return None, messages, traceback.format_exc()
 
 class RandomizeYear:
     
@@ -57,6 +72,12 @@ class DensityCorrectionCalculator:
 
         return row[self.windSpeedColumn] * (row[self.densityColumn] / self.referenceDensity) ** (1.0 / 3.0)
 
+    def densityCorrectedHubWindSpeeds(self, dataFrame):
+
+        #same power law as the row-wise version, evaluated over the columns (missing values propagate as NaN)
+        with np.errstate(invalid = 'ignore'):
+            return dataFrame[self.windSpeedColumn].values * (dataFrame[self.densityColumn].values / self.referenceDensity) ** (1.0 / 3.0)
+
 
 class PowerCalculator:
 
@@ -68,6 +89,9 @@ class PowerCalculator:
     def power(self, row):
         return self.powerCurve.power(row[self.windSpeedColumn])
 
+    def powers(self, dataFrame):
+        return pd.Series(self.powerCurve.power(dataFrame[self.windSpeedColumn].values), index = dataFrame.index)
+
 class TurbulencePowerCalculator:
 
     def __init__(self, powerCurve, ratedPower, windSpeedColumn, turbulenceColumn):
@@ -80,15 +104,19 @@ class TurbulencePowerCalculator:
     def power(self, row):
         return self.powerCurve.power(row[self.windSpeedColumn], row[self.turbulenceColumn])
 
+    def powers(self, dataFrame):
+        return pd.Series(self.powerCurve.power(dataFrame[self.windSpeedColumn].values, dataFrame[self.turbulenceColumn].values), index = dataFrame.index)
+
 
 class PowerDeviationMatrixPowerCalculator:
     
-    def __init__(self, powerCurve, powerDeviationMatrix, windSpeedColumn, parameterColumns):
+    def __init__(self, powerCurve, powerDeviationMatrix, windSpeedColumn, parameterColumns, interpolate = False):
 
         self.powerCurve = powerCurve
         self.powerDeviationMatrix = powerDeviationMatrix
         self.windSpeedColumn = windSpeedColumn
         self.parameterColumns = parameterColumns
+        self.interpolate = interpolate
 
     def power(self, row):
 
@@ -99,13 +127,24 @@ class PowerDeviationMatrixPowerCalculator:
             value = row[column]
             parameters[dimension.parameter] = value
 
-        deviation = self.powerDeviationMatrix[parameters]
+        deviation = self.powerDeviationMatrix.deviations(parameters, self.interpolate)[0]
 
         return self.powerCurve.power(row[self.windSpeedColumn]) * (1.0 + deviation)
 
+    def powers(self, dataFrame):
+
+        parameters = {}
+
+        for dimension in self.powerDeviationMatrix.dimensions:
+            parameters[dimension.parameter] = dataFrame[self.parameterColumns[dimension.parameter]].values
+
+        deviations = self.powerDeviationMatrix.deviations(parameters, self.interpolate)
+
+        return pd.Series(self.powerCurve.power(dataFrame[self.windSpeedColumn].values) * (1.0 + deviations), index = dataFrame.index)
+
 class SubPower:
             
-    def __init__(self, unfiltered_data_frame, filtered_data_frame, aggregations, wind_speed_column, power_polumn, wind_speed_bins, sub_divisions = 4):
+    def __init__(self, data_frame, mask, aggregations, wind_speed_column, power_polumn, wind_speed_bins, sub_divisions = 4, cache = None):
 
         self.sub_divisions = sub_divisions
         self.aggregations = aggregations
@@ -122,30 +161,61 @@ class SubPower:
                             self.sub_width(wind_speed_bins), \
                             self.center_of_last_sub_bin(wind_speed_bins))
 
-        self.unfiltered_sub_power = self.calculate_sub_power(unfiltered_data_frame)   
-        self.filtered_sub_power = self.calculate_sub_power(filtered_data_frame)
+        #the sub-bin indices and the unfiltered sub-power only depend on the time series, its wind speed and power columns
+        #and the sub-bins, so are shared by all the curves calculated from the same data (e.g. all/day/night/inner/outer)
+        if cache is None:
+            cache = {}
 
-        Status.add("Creating cut-in wind speed", verbosity=2)
-        self.cut_in_wind_speed = self.calculate_cut_in_speed(self.unfiltered_sub_power)
-    
-    def calculate_sub_power(self, data_frame):
-        
-        # TODO this line generates the following pandas warning
-        # data_frame[self.wind_speed_sub_bin_col] = data_frame[self.wind_speed_column].map(self.wind_speed_sub_bins.binCenter)
-        # SettingWithCopyWarning: 
-        # A value is trying to be set on a copy of a slice from a DataFrame.
-        # Try using .loc[row_indexer,col_indexer] = value instead
-        # See the caveats in the documentation: http://pandas.pydata.org/pandas-docs/stable/indexing.html#indexing-view-versus-copy
+        #the frame is held by its cache entry, so its id cannot be reused by another frame while the entry exists
+        frame_key = (id(data_frame), len(data_frame))
+        bins_key = (self.wind_speed_sub_bins.centerOfFirstBin, self.wind_speed_sub_bins.binWidth, self.wind_speed_sub_bins.centerOfLastBin)
 
-        data_frame.loc[:, self.wind_speed_sub_bin_col] = data_frame[self.wind_speed_column].map(self.wind_speed_sub_bins.binCenter)
+        indices_key = (frame_key, wind_speed_column, bins_key)
+        sub_power_key = (frame_key, wind_speed_column, power_polumn, bins_key)
+
+        if indices_key not in cache:
+            cache[indices_key] = (data_frame, ) + self.calculate_sub_bin_indices(data_frame)
+
+        indices, valid = cache[indices_key][1:]
+        powers = data_frame[power_polumn].values
+
+        if sub_power_key not in cache:
+            unfiltered_sub_power = self.calculate_sub_power(indices, valid, powers)
+            Status.add("Creating cut-in wind speed", verbosity=2)
+            cache[sub_power_key] = (unfiltered_sub_power, self.calculate_cut_in_speed(unfiltered_sub_power))
+
+        self.unfiltered_sub_power, self.cut_in_wind_speed = cache[sub_power_key]
+        self.filtered_sub_power = self.calculate_sub_power(indices[mask], valid[mask], powers[mask])
+
+    def calculate_sub_bin_indices(self, data_frame):
+
+        #integer sub-bin index of each record (valid where the wind speed is not missing)
+        indices = self.wind_speed_sub_bins.binIndices(data_frame[self.wind_speed_column].values)
+        valid = ~np.isnan(indices)
+
+        #the sub-bin centres are kept as a column of the time series (e.g. for export)
+        data_frame[self.wind_speed_sub_bin_col] = self.wind_speed_sub_bins.binCenterByIndex(indices)
+
+        return np.where(valid, indices, 0).astype(np.int64), valid
+
+    def calculate_sub_power(self, indices, valid, powers):
 
         Status.add("Creating sub-power distribution", verbosity=2)
 
-        sub_distribution = data_frame[self.power_polumn].groupby(data_frame[self.wind_speed_sub_bin_col]).agg({self.data_count:'count'})
-        sub_power = data_frame[[self.power_polumn]].groupby(data_frame[self.wind_speed_sub_bin_col]).agg({self.power_polumn:'mean'})
-                
-        sub_power = sub_power.join(sub_distribution, how = 'inner')
-        sub_power.dropna(inplace = True)                           
+        sub_bins, codes = np.unique(indices[valid], return_inverse=True)
+
+        powers = powers[valid]
+        present = ~np.isnan(powers)
+
+        counts = np.bincount(codes[present], minlength=len(sub_bins))
+        sums = np.bincount(codes[present], weights=powers[present], minlength=len(sub_bins))
+
+        #only sub-bins with at least one power value
+        populated = counts > 0
+
+        sub_power = pd.DataFrame({self.power_polumn: sums[populated] / counts[populated], self.data_count: counts[populated]},
+                                 index = pd.Index(self.wind_speed_sub_bins.binCenterByIndex(sub_bins[populated]), name = self.wind_speed_sub_bin_col),
+                                 columns = [self.power_polumn, self.data_count])
 
         return sub_power
         
@@ -208,6 +278,95 @@ class SubPower:
         
         return cut_in
 
+class MeasuredPowerCurveStatistics:
+
+    def __init__(self, data_frame, bin_column, masks, columns, deviation_column):
+
+        #per-bin counts, sums and (shifted) sums of squares for a set of possibly overlapping subsets (e.g. all/day/night),
+        #accumulated in one pass keyed by wind speed bin and subset membership pattern
+
+        self.masks = masks
+        self.columns = columns
+        self.deviation_column = deviation_column
+
+        names = masks.keys()
+        membership = np.zeros(len(data_frame), dtype=np.int64)
+
+        for index, name in enumerate(names):
+            membership |= np.asarray(masks[name], dtype=np.int64) << index
+
+        bin_values = data_frame[bin_column].values.astype(float)
+        valid = (membership > 0) & ~np.isnan(bin_values)
+
+        self.bin_centers, bin_codes = np.unique(bin_values[valid], return_inverse=True)
+        patterns, pattern_codes = np.unique(membership[valid], return_inverse=True)
+
+        shape = (len(self.bin_centers), len(patterns))
+        keys = bin_codes * len(patterns) + pattern_codes
+        size = shape[0] * shape[1]
+
+        self.records = np.bincount(keys, minlength=size).reshape(shape)
+
+        self.counts = {}
+        self.sums = {}
+
+        for column in columns:
+
+            values = data_frame[column].values[valid].astype(float)
+            present = ~np.isnan(values)
+
+            #(bincount returns integer sums when a column has no values, so the sums are always made float)
+            self.counts[column] = np.bincount(keys[present], minlength=size).reshape(shape)
+            self.sums[column] = np.bincount(keys[present], weights=values[present], minlength=size).astype(float).reshape(shape)
+
+        #squares are accumulated about each bin's overall mean to avoid cancellation in the variance
+        values = data_frame[deviation_column].values[valid].astype(float)
+        present = ~np.isnan(values)
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            shifts = self.sums[deviation_column].sum(axis=1) / self.counts[deviation_column].sum(axis=1)
+
+        deviations = values[present] - shifts[bin_codes[present]]
+
+        self.shifted_sums = np.bincount(keys[present], weights=deviations, minlength=size).astype(float).reshape(shape)
+        self.shifted_squares = np.bincount(keys[present], weights=deviations ** 2, minlength=size).astype(float).reshape(shape)
+
+        self.members = dict((name, (patterns >> index) & 1 == 1) for index, name in enumerate(names))
+
+    def subset(self, name, matrix):
+        return matrix[:, self.members[name]].sum(axis=1)
+
+    def count(self, name, column):
+        return self.subset(name, self.counts[column])
+
+    def average(self, name, column, minimum_count = 0):
+
+        counts = self.count(name, column)
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            means = self.subset(name, self.sums[column]) / counts
+
+        means[(counts < minimum_count) | (counts == 0)] = np.nan
+
+        return means
+
+    def stddev(self, name):
+
+        #sample standard deviation (NaN for fewer than two records, as pandas)
+        counts = self.count(name, self.deviation_column)
+        sums = self.subset(name, self.shifted_sums)
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            variances = (self.subset(name, self.shifted_squares) - sums * sums / counts) / (counts - 1)
+
+        variances[counts < 2] = np.nan
+
+        return np.sqrt(np.maximum(variances, 0.0))
+
+    def populated(self, name):
+        #bins holding at least one record of the subset
+        return self.subset(name, self.records) > 0
+
 class Analysis:
 
     def __init__(self, config):
@@ -258,6 +417,7 @@ class Analysis:
                 raise Exception("Power deviation matrix path not set.")
 
             self.specifiedPowerDeviationMatrix = PowerDeviationMatrixConfiguration(config.specified_power_deviation_matrix.absolute_path)
+            self.power_deviation_matrix_interpolation_mode = config.power_deviation_matrix_interpolation_mode
 
         self.powerCurveMinimumCount = config.powerCurveMinimumCount
         self.power_deviation_matrix_minimum_count = config.power_deviation_matrix_minimum_count
@@ -267,6 +427,11 @@ class Analysis:
 
         self.interpolationMode = config.interpolationMode
         self.powerCurveMode = config.powerCurveMode
+
+        if config.turbRenormLookupActive:
+            self.simulated_power_factory = turbine.SimulatedPowerLookupFactory(config.turbRenormLookupWindSpeedStep, config.turbRenormLookupTurbulenceStep)
+        else:
+            self.simulated_power_factory = turbine.SimulatedPowerFactory()
         
         self.negative_power_period_treatment = config.negative_power_period_treatment
         self.negative_power_bin_average_treatment = config.negative_power_bin_average_treatment
@@ -279,7 +444,9 @@ class Analysis:
         self.windSpeedBins = binning.Bins(config.powerCurveFirstBin, config.powerCurveBinSize, config.powerCurveLastBin)
 
         self.aggregations = binning.Aggregations(self.powerCurveMinimumCount)
-        self.pdm_aggregations = binning.Aggregations(self.power_deviation_matrix_minimum_count)
+
+        #sub-bin statistics shared by the measured power curves (the time series rows are fixed by the time these are calculated)
+        self.subPowerCache = {}
         
         if config.specified_power_curve.absolute_path != None :
 
@@ -288,7 +455,8 @@ class Analysis:
             self.specifiedPowerCurve = turbine.PowerCurve(powerCurveConfig.powerCurveLevels, powerCurveConfig.powerCurveDensity, \
                                                           self.rotorGeometry, actualPower = "Specified Power", hubTurbulence = "Specified Turbulence", \
                                                           name = 'Specified', interpolationMode = self.interpolationMode,
-                                                          zero_ti_pc_required = (self.powerCurveMode == 'Specified'))
+                                                          zero_ti_pc_required = (self.powerCurveMode == 'Specified'),
+                                                          simulated_power_factory = self.simulated_power_factory)
 
             self.referenceDensity = self.specifiedPowerCurve.referenceDensity
             
@@ -302,7 +470,7 @@ class Analysis:
                 Status.add("Performing Density Correction")
                 Status.add("Mean measured density is %.4f kg/m^3" % self.dataFrame[self.hubDensity].mean())
                 Status.add("Correcting to reference density of %.4f kg/m^3" % self.referenceDensity)
-                self.dataFrame[self.densityCorrectedHubWindSpeed] = self.dataFrame.apply(DensityCorrectionCalculator(self.referenceDensity, self.hubWindSpeed, self.hubDensity).densityCorrectedHubWindSpeed, axis=1)
+                self.dataFrame[self.densityCorrectedHubWindSpeed] = DensityCorrectionCalculator(self.referenceDensity, self.hubWindSpeed, self.hubDensity).densityCorrectedHubWindSpeeds(self.dataFrame)
                 self.dataFrame[self.inputHubWindSpeed] = self.dataFrame[self.densityCorrectedHubWindSpeed]
                 self.inputHubWindSpeedSource = self.densityCorrectedHubWindSpeed
             else:
@@ -311,7 +479,7 @@ class Analysis:
             self.dataFrame[self.inputHubWindSpeed] = self.dataFrame[self.hubWindSpeed]
             self.inputHubWindSpeedSource = self.hubWindSpeed
 
-        self.dataFrame[self.windSpeedBin] = self.dataFrame[self.inputHubWindSpeed].map(self.windSpeedBins.binCenter)        
+        self.dataFrame[self.windSpeedBin] = self.windSpeedBins.binCenters(self.dataFrame[self.inputHubWindSpeed])        
 
         self.applyRemainingFilters() #To do: record rows which are removed by each filter independently, as opposed to sequentially.
 
@@ -344,14 +512,23 @@ class Analysis:
 
             Status.add("Calculating actual power curves...")
 
-            self.allMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_base_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'All Measured', zero_ti_pc_required = (self.powerCurveMode == 'AllMeasured'))
+            filters = {'All Measured': self.get_base_filter, 'Day Time': self.get_day_filter, 'Night Time': self.get_night_filter}
+
+            if self.hasShear:
+                filters['Inner Range'] = self.get_inner_range_filter
+                filters['Outer Range'] = self.get_outer_range_filter
+
+            #the per-bin statistics of all the measured curves come from a single grouped pass
+            statistics = self.calculateMeasuredPowerCurveStatistics(filters, self.actualPower)
+
+            self.allMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_base_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'All Measured', zero_ti_pc_required = (self.powerCurveMode == 'AllMeasured'), statistics = statistics)
             
-            self.dayTimePowerCurve = self.calculateMeasuredPowerCurve(self.get_day_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Day Time', zero_ti_pc_required = False)
-            self.nightTimePowerCurve = self.calculateMeasuredPowerCurve(self.get_night_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Night Time', zero_ti_pc_required = False)
+            self.dayTimePowerCurve = self.calculateMeasuredPowerCurve(self.get_day_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Day Time', zero_ti_pc_required = False, statistics = statistics)
+            self.nightTimePowerCurve = self.calculateMeasuredPowerCurve(self.get_night_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Night Time', zero_ti_pc_required = False, statistics = statistics)
 
             if self.hasShear:
-                self.innerMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_inner_range_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Inner Range', zero_ti_pc_required = (self.powerCurveMode == 'InnerMeasured'))            
-                self.outerMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_outer_range_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Outer Range', zero_ti_pc_required = (self.powerCurveMode == 'OuterMeasured'))
+                self.innerMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_inner_range_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Inner Range', zero_ti_pc_required = (self.powerCurveMode == 'InnerMeasured'), statistics = statistics)            
+                self.outerMeasuredPowerCurve = self.calculateMeasuredPowerCurve(self.get_outer_range_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.actualPower, 'Outer Range', zero_ti_pc_required = (self.powerCurveMode == 'OuterMeasured'), statistics = statistics)
 
             Status.add("Actual Power Curves Complete.")
 
@@ -398,7 +575,7 @@ class Analysis:
             Status.add("Turbulence Correction Complete.")
 
             if self.hasActualPower:
-                self.allMeasuredTurbCorrectedPowerCurve = self.calculateMeasuredPowerCurve(self.get_base_filter(), self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.measuredTurbulencePower, 'Turbulence Corrected', zero_ti_pc_required = False)
+                self.allMeasuredTurbCorrectedPowerCurve = self.calculateMeasuredPowerCurve(self.get_base_filter, self.cutInWindSpeed, self.cutOutWindSpeed, self.ratedPower, self.measuredTurbulencePower, 'Turbulence Corrected', zero_ti_pc_required = False)
 
         if config.turbRenormActive and config.rewsActive:
             Status.add("Calculating Combined (REWS + Turbulence) Correction...")
@@ -554,9 +731,55 @@ class Analysis:
             self.innerRangeUpperShear = config.innerRangeUpperShear
             self.innerRangeCenterShear = 0.5 * self.innerRangeLowerShear + 0.5 * self.innerRangeUpperShear
 
+    def configure_dataset(self, dataset_config):
+        pass
+
     def load_dataset(self, dataset_config, analysis_config):
         return dataset.Dataset(dataset_config, analysis_config)
 
+    def load_in_parallel(self, dataset_configs, analysis_config):
+
+        if not analysis_config.parallelLoading:
+            return False
+
+        #workers always build dataset.Dataset, so analyses which override load_dataset are loaded serially
+        if self.__class__.load_dataset.im_func is not Analysis.load_dataset.im_func:
+            return False
+
+        return min(len(dataset_configs), multiprocessing.cpu_count()) > 1
+
+    def load_datasets(self, dataset_configs, analysis_config):
+
+        for dataset_config in dataset_configs:
+            self.configure_dataset(dataset_config)
+
+        if not self.load_in_parallel(dataset_configs, analysis_config):
+            return [self.load_dataset(dataset_config, analysis_config) for dataset_config in dataset_configs]
+
+        pool = multiprocessing.Pool(min(len(dataset_configs), multiprocessing.cpu_count()))
+
+        try:
+            results = pool.map(load_dataset_in_worker, [(dataset_config, analysis_config, Status.get().verbosity) for dataset_config in dataset_configs])
+        finally:
+            pool.close()
+            pool.join()
+
+        datasets = []
+
+        for dataset_config, (data, messages, error) in zip(dataset_configs, results):
+
+            for message, red in messages:
+                Status.get().status_method(message, red)
+
+            if error is not None:
+                raise Exception("Cannot load dataset {0}:\n{1}".format(dataset_config.name, error))
+
+            Status.add("Loaded dataset {0}".format(dataset_config.name), verbosity=2)
+
+            datasets.append(data)
+
+        return datasets
+
     def loadData(self, config):
 
         self.residualWindSpeedMatrices = {}
@@ -567,14 +790,23 @@ class Analysis:
 
         self.multiple_datasets = (len(config.datasets) > 1)
 
+        datasetConfigs = []
+
         for i in range(len(config.datasets)):
 
             if not isinstance(config.datasets[i],DatasetConfiguration):
-                datasetConfig = DatasetConfiguration(config.datasets[i].absolute_path)
+                datasetConfigs.append(DatasetConfiguration(config.datasets[i].absolute_path))
             else:
-                datasetConfig = config.datasets[i]
+                datasetConfigs.append(config.datasets[i])
+
+        datasets = self.load_datasets(datasetConfigs, config)
+        dataFrames = []
+
+        for i in range(len(datasetConfigs)):
 
-            data = self.load_dataset(datasetConfig, config)
+            #datasets loaded in worker processes hold their own (filtered) copy of the configuration
+            data = datasets[i]
+            datasetConfig = data.config
 
             if self.productionByHeightActive:
                 self.original_datasets.append(data)
@@ -607,7 +839,6 @@ class Analysis:
                 self.actualPower = data.actualPower
                 self.residualWindSpeed = data.residualWindSpeed
 
-                self.dataFrame = data.dataFrame
                 self.hasActualPower = data.hasActualPower
                 self.hasAllPowers = data.hasAllPowers
                 self.hasShear = data.hasShear
@@ -619,8 +850,6 @@ class Analysis:
                 if datasetConfig.timeStepInSeconds <> self.timeStepInSeconds:
                     raise Exception ("Dataset time step (%d) does not match analysis (%d) time step" % (datasetConfig.timeStepInSeconds, self.timeStepInSeconds))
 
-                self.dataFrame = self.dataFrame.append(data.dataFrame, ignore_index = True)
-
                 self.hasActualPower = self.hasActualPower & data.hasActualPower
                 self.hasAllPowers = self.hasAllPowers & data.hasAllPowers
                 self.hasShear = self.hasShear & data.hasShear
@@ -629,6 +858,13 @@ class Analysis:
 
             self.residualWindSpeedMatrices[data.name] = data.residualWindSpeedMatrix
 
+            dataFrames.append(data.dataFrame)
+
+        if len(dataFrames) > 1:
+            self.dataFrame = pd.concat(dataFrames, ignore_index = True)
+        else:
+            self.dataFrame = dataFrames[0]
+
         self.dataFrame.set_index([self.datasetName, self.timeStamp])
 
         self.timeStampHours = float(self.timeStepInSeconds) / 3600.0
@@ -735,33 +971,50 @@ class Analysis:
         return mask
 
     def interpolatePowerCurve(self, powerCurveLevels, ws_col, interp_power_col):
-        self.dataFrame[interp_power_col] = self.dataFrame[ws_col].apply(powerCurveLevels.power)
+        self.dataFrame[interp_power_col] = PowerCalculator(powerCurveLevels, ws_col).powers(self.dataFrame)
 
-    def calculateMeasuredPowerCurve(self, filter_func, cutInWindSpeed, cutOutWindSpeed, ratedPower, powerColumn, name, zero_ti_pc_required = False):
+    def calculateMeasuredPowerCurveStatistics(self, filters, powerColumn):
+
+        mask = (self.dataFrame[powerColumn] > (self.ratedPower * -.25)) & (self.dataFrame[self.inputHubWindSpeed] > 0) & (self.dataFrame[self.hubTurbulence] > 0)
+
+        masks = {}
+
+        for name in filters:
+            masks[name] = (mask & filters[name]()).values
+
+        columns = [powerColumn, self.inputHubWindSpeed, self.hubTurbulence]
+
+        if self.powerCoeff in self.dataFrame.columns:
+            columns.append(self.powerCoeff)
+
+        return MeasuredPowerCurveStatistics(self.dataFrame, self.windSpeedBin, masks, columns, powerColumn)
+
+    def calculateMeasuredPowerCurve(self, filter_func, cutInWindSpeed, cutOutWindSpeed, ratedPower, powerColumn, name, zero_ti_pc_required = False, statistics = None):
 
         Status.add("Calculating %s power curve." % name, verbosity=2)       
         
-        mask = (self.dataFrame[powerColumn] > (self.ratedPower * -.25)) & (self.dataFrame[self.inputHubWindSpeed] > 0) & (self.dataFrame[self.hubTurbulence] > 0) & filter_func()
-        
-        filteredDataFrame = self.dataFrame[mask]
+        if statistics is None:
+            statistics = self.calculateMeasuredPowerCurveStatistics({name: filter_func}, powerColumn)
+
+        mask = statistics.masks[name]
         
-        Status.add("%s rows of data being used for %s power curve." % (len(filteredDataFrame), name), verbosity=2)
+        Status.add("%s rows of data being used for %s power curve." % (mask.sum(), name), verbosity=2)
 
         #storing power curve in a dataframe as opposed to dictionary
-        dfPowerLevels = filteredDataFrame[[powerColumn, self.inputHubWindSpeed, self.hubTurbulence]].groupby(filteredDataFrame[self.windSpeedBin]).aggregate(self.aggregations.average)
-        powerStdDev = filteredDataFrame[[powerColumn, self.inputHubWindSpeed]].groupby(filteredDataFrame[self.windSpeedBin]).std().rename(columns={powerColumn:self.powerStandDev})[self.powerStandDev]
-        
-        dfDataCount = filteredDataFrame[powerColumn].groupby(filteredDataFrame[self.windSpeedBin]).agg({self.dataCount:'count'})
+        populated = statistics.populated(name)
+        binIndex = pd.Index(statistics.bin_centers[populated], name = self.windSpeedBin)
 
-        if not all(dfPowerLevels.index == dfDataCount.index):
-            raise Exception("Index of aggregated data count and mean quantities for measured power curve do not match.")
-            
-        dfPowerLevels = dfPowerLevels.join(dfDataCount, how = 'inner')
-        dfPowerLevels = dfPowerLevels.join(powerStdDev, how = 'inner')
+        dfPowerLevels = pd.DataFrame(index = binIndex)
+
+        for column in [powerColumn, self.inputHubWindSpeed, self.hubTurbulence]:
+            dfPowerLevels[column] = statistics.average(name, column, self.powerCurveMinimumCount)[populated]
+
+        dfPowerLevels[self.dataCount] = statistics.count(name, powerColumn)[populated]
+        dfPowerLevels[self.powerStandDev] = statistics.stddev(name)[populated]
         dfPowerLevels.dropna(inplace = True)
                 
-        if self.powerCoeff in filteredDataFrame.columns:
-            dfPowerCoeff = filteredDataFrame[self.powerCoeff].groupby(filteredDataFrame[self.windSpeedBin]).aggregate(self.aggregations.average)
+        if self.powerCoeff in statistics.columns:
+            dfPowerCoeff = pd.Series(statistics.average(name, self.powerCoeff, self.powerCurveMinimumCount)[populated], index = binIndex)
         else:
             dfPowerCoeff = None
         
@@ -800,7 +1053,7 @@ class Analysis:
             Status.add(powerLevels.head(len(powerLevels)), verbosity=2)
             
             Status.add("Calculating sub-power", verbosity=2)
-            sub_power = SubPower(self.dataFrame, filteredDataFrame, self.aggregations, self.inputHubWindSpeed, powerColumn, self.windSpeedBins)
+            sub_power = SubPower(self.dataFrame, mask, self.aggregations, self.inputHubWindSpeed, powerColumn, self.windSpeedBins, cache = self.subPowerCache)
                             
             Status.add("Creating turbine", verbosity=2)     
             
@@ -808,19 +1061,10 @@ class Analysis:
                                             hubTurbulence = self.hubTurbulence, actualPower = powerColumn,
                                             name = name, interpolationMode = self.interpolationMode, 
                                             zero_ti_pc_required = zero_ti_pc_required, xLimits = self.windSpeedBins.limits, 
-                                            sub_power = sub_power)
+                                            sub_power = sub_power, simulated_power_factory = self.simulated_power_factory)
                 
             return turb
 
-    def get_deviation_matrix_bins(self, data_frame):
-
-        dimension_bins = []
-
-        for dimension in self.calculated_power_deviation_matrix_bins:
-            dimension_bins.append(data_frame[dimension.bin_parameter])
-
-        return dimension_bins
-
     def calculatePowerDeviationMatrix(self, power, filter_func = None):
 
         if filter_func is None:
@@ -837,18 +1081,17 @@ class Analysis:
         filteredDataFrame.is_copy = False
         filteredDataFrame[powerDeviation] = (filteredDataFrame[self.actualPower] - filteredDataFrame[power]) / filteredDataFrame[power]
 
-        dimension_bins = self.get_deviation_matrix_bins(filteredDataFrame)
-
         if self.power_deviation_matrix_method == 'Average of Deviations':
-            devMatrix = AverageOfDeviationsMatrix(filteredDataFrame[powerDeviation].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[powerDeviation].groupby(dimension_bins).count(),
-                                        self.calculated_power_deviation_matrix_bins)
+            devMatrix = AverageOfDeviationsMatrix(filteredDataFrame,
+                                        powerDeviation,
+                                        self.calculated_power_deviation_matrix_bins,
+                                        self.power_deviation_matrix_minimum_count)
         elif self.power_deviation_matrix_method == 'Deviation of Averages':
-            devMatrix = DeviationOfAveragesMatrix(
-                                        filteredDataFrame[self.actualPower].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[power].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[power].groupby(dimension_bins).count(),
-                                        self.calculated_power_deviation_matrix_bins)
+            devMatrix = DeviationOfAveragesMatrix(filteredDataFrame,
+                                        self.actualPower,
+                                        power,
+                                        self.calculated_power_deviation_matrix_bins,
+                                        self.power_deviation_matrix_minimum_count)
         else:
             raise Exception('Unknown PDM method: {0}'.format(self.power_deviation_matrix_method))
 
@@ -864,20 +1107,19 @@ class Analysis:
 
         filteredDataFrame = self.dataFrame[mask]
 
-        dimension_bins = self.get_deviation_matrix_bins(filteredDataFrame)
-
         self.dataFrame[self.rewsToHubRatio] - 1.0
 
         if self.power_deviation_matrix_method == 'Average of Deviations':
-            rewsMatrix = AverageOfDeviationsMatrix(filteredDataFrame[self.rewsToHubRatioDeviation].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[self.rewsToHubRatioDeviation].groupby(dimension_bins).count(),
-                                        self.calculated_power_deviation_matrix_bins)
+            rewsMatrix = AverageOfDeviationsMatrix(filteredDataFrame,
+                                        self.rewsToHubRatioDeviation,
+                                        self.calculated_power_deviation_matrix_bins,
+                                        self.power_deviation_matrix_minimum_count)
         elif self.power_deviation_matrix_method == 'Deviation of Averages':
-            rewsMatrix = DeviationOfAveragesMatrix(
-                                        filteredDataFrame[self.inputHubWindSpeed].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[self.rotorEquivalentWindSpeed].groupby(dimension_bins).aggregate(self.pdm_aggregations.average),
-                                        filteredDataFrame[self.rotorEquivalentWindSpeed].groupby(dimension_bins).count(),
-                                        self.calculated_power_deviation_matrix_bins)
+            rewsMatrix = DeviationOfAveragesMatrix(filteredDataFrame,
+                                        self.inputHubWindSpeed,
+                                        self.rotorEquivalentWindSpeed,
+                                        self.calculated_power_deviation_matrix_bins,
+                                        self.power_deviation_matrix_minimum_count)
         else:
             raise Exception('Unknown PDM method: {0}'.format(self.power_deviation_matrix_method))
 
@@ -889,7 +1131,7 @@ class Analysis:
         
         try:
             
-            energyDiffMWh = np.abs((self.dataFrame.loc[rows, powerColumn] - self.dataFrame.loc[rows, self.inputHubWindSpeed].apply(measuredPowerCurve.power)) * (float(self.timeStepInSeconds) / 3600.))
+            energyDiffMWh = np.abs((self.dataFrame.loc[rows, powerColumn] - PowerCalculator(measuredPowerCurve, self.inputHubWindSpeed).powers(self.dataFrame.loc[rows])) * (float(self.timeStepInSeconds) / 3600.))
             energyMWh = self.dataFrame.loc[rows, powerColumn] * (float(self.timeStepInSeconds) / 3600.)
             powerCurveScatterMetric = energyDiffMWh.sum() / energyMWh.sum()
 
@@ -972,7 +1214,7 @@ class Analysis:
         return a
 
     def calculateHub(self):
-        self.dataFrame[self.hubPower] = self.dataFrame.apply(PowerCalculator(self.powerCurve, self.inputHubWindSpeed).power, axis=1)
+        self.dataFrame[self.hubPower] = PowerCalculator(self.powerCurve, self.inputHubWindSpeed).powers(self.dataFrame)
 
     def calculateREWS(self):
 
@@ -980,11 +1222,11 @@ class Analysis:
         self.dataFrame[self.rewsToHubRatioDeviation] = self.dataFrame[self.rewsToHubRatio] - 1.0
 
         self.dataFrame[self.rotorEquivalentWindSpeed] = self.dataFrame[self.inputHubWindSpeed] * self.dataFrame[self.rewsToHubRatio]
-        self.dataFrame[self.rewsPower] = self.dataFrame.apply(PowerCalculator(self.powerCurve, self.rotorEquivalentWindSpeed).power, axis=1)
+        self.dataFrame[self.rewsPower] = PowerCalculator(self.powerCurve, self.rotorEquivalentWindSpeed).powers(self.dataFrame)
 
     def calculateTurbRenorm(self):
 
-        self.dataFrame[self.turbulencePower] = self.dataFrame.apply(TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.inputHubWindSpeed, self.hubTurbulence).power, axis=1)
+        self.dataFrame[self.turbulencePower] = TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.inputHubWindSpeed, self.hubTurbulence).powers(self.dataFrame)
 
         if self.hasActualPower:
             if self.rewsActive:
@@ -993,7 +1235,7 @@ class Analysis:
                 self.dataFrame[self.measuredTurbulencePower] = (self.dataFrame[self.actualPower] - self.dataFrame[self.turbulencePower] + self.dataFrame[self.hubPower])
 
     def calculationCombined(self):
-        self.dataFrame[self.combinedPower] = self.dataFrame.apply(TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.rotorEquivalentWindSpeed, self.hubTurbulence).power, axis=1)
+        self.dataFrame[self.combinedPower] = TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.rotorEquivalentWindSpeed, self.hubTurbulence).powers(self.dataFrame)
 
     def calculatePowerDeviationMatrixCorrection(self):
 
@@ -1009,11 +1251,11 @@ class Analysis:
             else:
                 raise Exception("Unknown parameter %s" % dimension.parameter)
 
-        self.dataFrame[self.powerDeviationMatrixPower] = self.dataFrame.apply(PowerDeviationMatrixPowerCalculator(self.powerCurve, \
-                                                                                                                  self.specifiedPowerDeviationMatrix, \
-                                                                                                                  self.inputHubWindSpeed, \
-                                                                                                                  parameterColumns).power, \
-                                                                                                                  axis=1)
+        self.dataFrame[self.powerDeviationMatrixPower] = PowerDeviationMatrixPowerCalculator(self.powerCurve, \
+                                                                                             self.specifiedPowerDeviationMatrix, \
+                                                                                             self.inputHubWindSpeed, \
+                                                                                             parameterColumns, \
+                                                                                             self.power_deviation_matrix_interpolation_mode == 'Multilinear').powers(self.dataFrame)
 
     def calculateProductionByHeightCorrection(self):
 
@@ -1075,24 +1317,11 @@ class Padder:
 
         return binArray
 
-    def levelExists(self, powerLevels, windSpeed):
-        
-        try:
-            dummy = powerLevels.loc[windSpeed, self.powerCol]
-            return True
-        except:
-            return False
-            
-    def turbulencePadValue(self, powerLevels, windSpeed):
+    def turbulencePadValues(self, powerLevels, windSpeeds):
 
         #revisit this logic
         
-        if windSpeed > self.max_key:
-            return powerLevels.loc[self.max_key, self.turbCol]
-        elif windSpeed < self.min_key:
-            return powerLevels.loc[self.min_key, self.turbCol]
-        else:
-            return powerLevels.loc[self.max_key, self.turbCol]
+        return np.where(windSpeeds < self.min_key, powerLevels.loc[self.min_key, self.turbCol], powerLevels.loc[self.max_key, self.turbCol])
         
     def pad(self, powerLevels, cutInWindSpeed, cutOutWindSpeed, ratedPower, bins):
 
@@ -1104,22 +1333,22 @@ class Padder:
         
         powerPadValue = self.powerPadValue()
         
-        for windSpeed in self.getWindSpeedBins(bins):
-            
-            if not self.levelExists(powerLevels, windSpeed):
+        windSpeeds = np.array(self.getWindSpeedBins(bins))
 
-                turbulencePadValue = self.turbulencePadValue(powerLevels, windSpeed)
-                
-                if windSpeed < self.min_key or windSpeed > self.max_key:
+        #only bins beyond the observed range are padded (gaps within it are left to the interpolation)
+        windSpeeds = windSpeeds[((windSpeeds < self.min_key) | (windSpeeds > self.max_key)) & ~np.in1d(windSpeeds, powerLevels.index.values)]
 
-                    powerLevels.loc[windSpeed, self.turbCol] = turbulencePadValue
-                    powerLevels.loc[windSpeed, self.wsCol] = windSpeed
-                    powerLevels.loc[windSpeed, self.countCol] = 0
-                
-                    if windSpeed < cutInWindSpeed or windSpeed > cutOutWindSpeed:
-                        powerLevels.loc[windSpeed, self.powerCol] = 0.0                                            
-                    else:
-                        powerLevels.loc[windSpeed, self.powerCol] = powerPadValue
+        if len(windSpeeds) > 0:
+
+            #padded rows are float throughout (so the count becomes float, as when rows were added one at a time with loc)
+            padding = pd.DataFrame(np.nan, index = pd.Index(windSpeeds, name = powerLevels.index.name), columns = powerLevels.columns)
+
+            padding[self.turbCol] = self.turbulencePadValues(powerLevels, windSpeeds)
+            padding[self.wsCol] = windSpeeds
+            padding[self.countCol] = 0.0
+            padding[self.powerCol] = np.where((windSpeeds < cutInWindSpeed) | (windSpeeds > cutOutWindSpeed), 0.0, powerPadValue)
+
+            powerLevels = pd.concat([powerLevels, padding])
                                             
         powerLevels.sort_index(inplace=True)
         
@@ -62,7 +62,7 @@ class BenchmarkAnalysis(Analysis):
             
                 raise Exception(exc_str)
             
-            self.dataFrame[self.basePower] = self.dataFrame.apply(PowerCalculator(self.powerCurve, self.inputHubWindSpeed).power, axis=1)
+            self.dataFrame[self.basePower] = PowerCalculator(self.powerCurve, self.inputHubWindSpeed).powers(self.dataFrame)
 
         elif self.baseLineMode == "Measured":
             
@@ -78,7 +78,7 @@ class BenchmarkAnalysis(Analysis):
         self.baseYield = self.dataFrame[self.get_base_filter()][self.basePower].sum() * self.timeStampHours
 
     def calculateHubBenchmark(self):
-        self.dataFrame[self.hubPower] = self.dataFrame.apply(PowerCalculator(self.powerCurve, self.inputHubWindSpeed).power, axis=1)
+        self.dataFrame[self.hubPower] = PowerCalculator(self.powerCurve, self.inputHubWindSpeed).powers(self.dataFrame)
         self.hubYield = self.dataFrame[self.get_base_filter()][self.hubPower].sum() * self.timeStampHours
         self.hubYieldCount = self.dataFrame[self.get_base_filter()][self.hubPower].count()
         self.hubDelta = self.hubYield / self.baseYield - 1.0
@@ -86,7 +86,7 @@ class BenchmarkAnalysis(Analysis):
 
     def calculateREWSBenchmark(self):
         if self.rewsActive:
-            self.dataFrame[self.rewsPower] = self.dataFrame.apply(PowerCalculator(self.powerCurve, self.rotorEquivalentWindSpeed).power, axis=1)
+            self.dataFrame[self.rewsPower] = PowerCalculator(self.powerCurve, self.rotorEquivalentWindSpeed).powers(self.dataFrame)
             self.rewsYield = self.dataFrame[self.get_base_filter()][self.rewsPower].sum() * self.timeStampHours
             self.rewsYieldCount = self.dataFrame[self.get_base_filter()][self.rewsPower].count()
             self.rewsDelta = self.rewsYield / self.baseYield - 1.0
@@ -94,7 +94,7 @@ class BenchmarkAnalysis(Analysis):
 
     def calculateTurbRenormBenchmark(self):
         if self.turbRenormActive:
-            self.dataFrame[self.turbulencePower] = self.dataFrame.apply(TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.inputHubWindSpeed, self.hubTurbulence).power, axis=1)
+            self.dataFrame[self.turbulencePower] = TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.inputHubWindSpeed, self.hubTurbulence).powers(self.dataFrame)
             self.turbulenceYield = self.dataFrame[self.get_base_filter()][self.turbulencePower].sum() * self.timeStampHours
             self.turbulenceYieldCount = self.dataFrame[self.get_base_filter()][self.turbulencePower].count()
             self.turbulenceDelta = self.turbulenceYield / self.baseYield - 1.0
@@ -104,7 +104,7 @@ class BenchmarkAnalysis(Analysis):
 
     def calculationCombinedBenchmark(self):
         if self.rewsActive and self.turbRenormActive:
-            self.dataFrame[self.combinedPower] = self.dataFrame.apply(TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.rotorEquivalentWindSpeed, self.hubTurbulence).power, axis=1)
+            self.dataFrame[self.combinedPower] = TurbulencePowerCalculator(self.powerCurve, self.ratedPower, self.rotorEquivalentWindSpeed, self.hubTurbulence).powers(self.dataFrame)
             self.combinedYield = self.dataFrame[self.get_base_filter()][self.combinedPower].sum() * self.timeStampHours
             self.combinedYieldCount = self.dataFrame[self.get_base_filter()][self.combinedPower].count()
             self.combinedDelta = self.combinedYield / self.baseYield - 1.0
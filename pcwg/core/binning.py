@@ -57,6 +57,8 @@ class Bins:
             self.limits.append(limit)
             self.centers.append(center)
 
+        self.startValues = np.array([limit[0] for limit in self.limits])
+
     def binIndexForFirstCenterAndWidth(self, x, centerOfFirstBin, binWidth):
         if np.isnan(x): return np.nan
         return int(round((x - centerOfFirstBin)/binWidth,0))
@@ -92,11 +94,63 @@ class Bins:
 
         return self.binCenterByIndex(index)
 
+    def binIndices(self, values):
+
+        #array equivalent of the index used by binCenter (NaN where values are NaN)
+
+        values = np.asarray(values, dtype=float)
+
+        with np.errstate(invalid = 'ignore'):
+
+            #round half away from zero (as the built-in round)
+            scaled = (values - self.centerOfFirstBin) / self.binWidth
+            magnitude = np.abs(scaled)
+            rounded = np.floor(magnitude)
+            rounded += ((magnitude - rounded) >= 0.5)
+            indices = np.copysign(rounded, scaled)
+
+            #nudge values at bin end into next bin
+            nudge = (np.abs(values - self.binEndByIndex(indices)) < Bins.TOLERANCE) & (indices < (self.numberOfBins - 1))
+            indices = np.where(nudge, indices + 1, indices)
+
+        #values exactly at a bin start belong to that bin
+        if len(self.startValues) > 0:
+            positions = np.searchsorted(self.startValues, values).clip(0, len(self.startValues) - 1)
+            indices = np.where(self.startValues[positions] == values, positions, indices)
+
+        return indices
+
+    def binCenters(self, values):
+        return self.binCenterByIndex(self.binIndices(values))
+
 class Aggregations:
 
+    #built-in groupby reductions equivalent to the per-group callables below
+    Reductions = {'average': 'mean', 'stddev': 'std', 'count': 'count', 'minimum': 'min'}
+
+    #aggregations which are NaN for groups with fewer than minimumCount values
+    Thresholded = ['average', 'stddev', 'standardError']
+
     def __init__(self, minimumCount = 0):
         self.minimumCount = minimumCount
 
+    def aggregate(self, grouped, aggregation):
+
+        #same result as grouped.aggregate(getattr(self, aggregation)) using pandas' compiled reductions,
+        #with the minimum count applied to the whole result afterwards
+
+        if aggregation == 'standardError':
+            values = grouped.std() / grouped.count()
+        elif aggregation in Aggregations.Reductions:
+            values = getattr(grouped, Aggregations.Reductions[aggregation])()
+        else:
+            raise Exception("Unknown aggregation: {0}".format(aggregation))
+
+        if aggregation in Aggregations.Thresholded:
+            values = values.where(grouped.count() >= self.minimumCount)
+
+        return values
+
     def standardError(self, x):
         if self.count(x) >= self.minimumCount:
             return x.std() / x.count()
@@ -11,6 +11,8 @@ import warnings
 
 from power_deviation_matrix import AverageOfDeviationsMatrix
 from power_deviation_matrix import PowerDeviationMatrixDimension
+from time_series_cache import TimeSeriesCache
+from file_hash import HashingReader
 
 from ..core.status import Status
 
@@ -32,6 +34,88 @@ def getDecimalValue(decimal):
     except:
         raise Exception("Unkown decimal: '%s'" % decimal)
 
+def readColumnHeader(path, separator, decimal, headerRows):
+
+    #only the header line is parsed, so this is quick regardless of file size
+    return list(pd.read_csv(path, sep = getSeparatorValue(separator), skiprows = headerRows, \
+                            decimal = getDecimalValue(decimal), nrows = 0).columns)
+
+def mergeIntervals(starts, ends):
+
+    #sorted, non-overlapping union of the closed intervals [start, end]; empty intervals are dropped
+    valid = starts <= ends
+    starts, ends = starts[valid], ends[valid]
+
+    if len(starts) < 1:
+        return starts, ends
+
+    order = np.argsort(starts, kind='mergesort')
+    starts, ends = starts[order], ends[order]
+
+    newInterval = np.ones(len(starts), dtype=bool)
+    newInterval[1:] = starts[1:] > np.maximum.accumulate(ends)[:-1]
+
+    firsts = np.flatnonzero(newInterval)
+
+    return starts[firsts], np.maximum.reduceat(ends, firsts)
+
+GasConstantDryAir = 287.058
+GasConstantWaterVapour = 461.5
+
+def airDensity(pressure, temperature, humidity = None):
+
+    #pressure in hPa, temperature in degrees C and (optional) relative humidity in %
+    temperature = np.asarray(temperature, dtype=float) + 273.15
+    pressure = 100.0 * np.asarray(pressure, dtype=float)
+
+    if humidity is None:
+        return pressure / temperature / GasConstantDryAir
+
+    #moist air density as per IEC 61400-12-1, with the vapour pressure (Pa) approximated from the temperature
+    vapourPressure = 0.0000205 * np.exp(0.0631846 * temperature)
+    humidity = np.asarray(humidity, dtype=float) / 100.0
+
+    return (pressure / GasConstantDryAir - humidity * vapourPressure * (1.0 / GasConstantDryAir - 1.0 / GasConstantWaterVapour)) / temperature
+
+NanosecondsPerDay = 24 * 3600 * 10 ** 9
+
+def timeOfDayInNanoseconds(time):
+    return ((time.hour * 60 + time.minute) * 60 + time.second) * 10 ** 9 + time.microsecond * 1000
+
+def parseTimeStamp(text, dateFormat):
+    try:
+        return datetime.datetime.strptime(text, dateFormat)
+    except (TypeError, ValueError):
+        return pd.NaT
+
+def parseTimeStamps(values, dateFormat, firstLine = 1):
+
+    #parse all time stamps in one pass, falling back to strptime for values the vectorised parser rejects
+    #(values are parsed as text, so numeric formats such as %Y%m%d%H%M are not read as integers)
+
+    values = pd.Index(values)
+
+    if values.dtype != object:
+        values = values.astype(str)
+
+    timeStamps = pd.to_datetime(values, format = dateFormat, errors = 'coerce')
+
+    invalid = np.flatnonzero(pd.isnull(timeStamps))
+
+    if len(invalid) > 0:
+
+        timeStamps = timeStamps.values.copy()
+        timeStamps[invalid] = pd.to_datetime([parseTimeStamp(values[i], dateFormat) for i in invalid]).values
+        timeStamps = pd.DatetimeIndex(timeStamps)
+
+        invalid = np.flatnonzero(pd.isnull(timeStamps))
+
+    if len(invalid) > 0:
+        lines = ", ".join(str(firstLine + i) for i in invalid[:10])
+        raise Exception("Cannot parse {0} time stamp(s) using format '{1}' (e.g. '{2}') at line(s): {3}{4}".format(len(invalid), dateFormat, values[invalid[0]], lines, ", ..." if len(invalid) > 10 else ""))
+
+    return timeStamps
+
 class CalibrationBase:
 
     def __init__(self, x, y):
@@ -41,33 +125,62 @@ class CalibrationBase:
 
         self.requiredColumns = [self.x, self.y]
 
-    def variance(self, df, col):
-        return ((df[col].mean() - df[col]) ** 2.0).sum()
+    def sectorStatistics(self, df, directionBinColumn):
+
+        #sufficient statistics of each direction sector from a single grouped sum
 
-    def covariance(self, df, colA, colB):
-        return df[[colA,colB]].cov()[colA][colB] # assumes unbiased estimator (normalises with N-1)
+        x = df[self.x]
+        y = df[self.y]
 
-    def sigA(self,df,slope, intercept, count):
-        sumPredYfromX = sum((df[self.y] - (intercept + df[self.x]*slope ))**2)
-        sumX = (df[self.x]).sum()
-        sumXX = (df[self.x]**2).sum()
-        return ((sumPredYfromX/(count-2))*(sumXX/(count*sumXX - sumX**2)))**0.5
+        values = pd.DataFrame({'count': 1,
+                               'x': x,
+                               'y': y,
+                               'xx': x ** 2,
+                               'yy': y ** 2,
+                               'xy': x * y,
+                               'yOverX': y / x,
+                               'below': (x <= 8.0).astype(int),
+                               'above': (x > 8.0).astype(int)}, index = df.index)
 
-    def sigB(self,df,slope, intercept, count):
-        sumPredYfromX = sum((df[self.y] - (intercept + df[self.x]*slope ))**2)
-        sumX = (df[self.x]).sum()
-        sumXX = (df[self.x]**2).sum()
-        return ((sumPredYfromX/(count-2))/(count*sumXX - sumX**2))**0.5
+        for column in self.requiredColumns[2:]:
+            values[column] = df[column]
 
-    def mean(self, df, col):
-        return df[col].mean()
+        return values.groupby(df[directionBinColumn]).sum()
 
-    def intercept(self, df, slope):
-        return self.mean(df, self.y) - slope * self.mean(df, self.x)
+    def sumOfProducts(self, statistics, a, b):
+        #sum of products of deviations from the sector means
+        return statistics[a + b] - statistics[a] * statistics[b] / statistics['count']
+
+    def variance(self, statistics, col):
+        return self.sumOfProducts(statistics, col, col)
+
+    def covariance(self, statistics):
+        return self.sumOfProducts(statistics, 'x', 'y') / (statistics['count'] - 1) # assumes unbiased estimator (normalises with N-1)
+
+    def correlation(self, statistics):
+        return self.sumOfProducts(statistics, 'x', 'y') / (self.variance(statistics, 'x') * self.variance(statistics, 'y')) ** 0.5
+
+    def sumPredYfromX(self, statistics, slope, intercept):
+        residualOfMeans = self.mean(statistics, 'y') - (intercept + self.mean(statistics, 'x') * slope)
+        return self.variance(statistics, 'y') - 2.0 * slope * self.sumOfProducts(statistics, 'x', 'y') + slope ** 2.0 * self.variance(statistics, 'x') + statistics['count'] * residualOfMeans ** 2.0
+
+    def sigA(self, statistics, slope, intercept):
+        count = statistics['count']
+        return ((self.sumPredYfromX(statistics, slope, intercept)/(count-2))*(statistics['xx']/(count*statistics['xx'] - statistics['x']**2)))**0.5
+
+    def sigB(self, statistics, slope, intercept):
+        count = statistics['count']
+        return ((self.sumPredYfromX(statistics, slope, intercept)/(count-2))/(count*statistics['xx'] - statistics['x']**2))**0.5
+
+    def mean(self, statistics, col):
+        return statistics[col] / statistics['count']
+
+    def intercept(self, statistics, slope):
+        return self.mean(statistics, 'y') - slope * self.mean(statistics, 'x')
 
 class York(CalibrationBase):
-    def covariance(self, df, colA, colB):
-        return ((df[colA].mean() - df[colA]) * (df[colB].mean() - df[colB])).sum()
+    def covariance(self, statistics):
+        return self.sumOfProducts(statistics, 'x', 'y')
 
     def __init__(self, x, y, timeStepInSeconds, df):
 
@@ -103,45 +216,38 @@ class York(CalibrationBase):
 
         return movingAverageWindow
 
-    def slope(self, df):
+    def slope(self, statistics):
 
-        alpha = self.calculateAlpha(df)
+        alpha = self.calculateAlpha(statistics)
 
-        varianceX = self.variance(df, self.x)
-        varianceY = self.variance(df, self.y)
-        covarianceXY = self.covariance(df, self.x, self.y)
+        varianceX = self.variance(statistics, 'x')
+        varianceY = self.variance(statistics, 'y')
+        covarianceXY = self.covariance(statistics)
 
-        gradientNumerator = math.sin(alpha) * varianceY + math.cos(alpha) * covarianceXY
-        gradientDenominator = math.sin(alpha) * covarianceXY + math.cos(alpha) * varianceX
+        gradientNumerator = np.sin(alpha) * varianceY + np.cos(alpha) * covarianceXY
+        gradientDenominator = np.sin(alpha) * covarianceXY + np.cos(alpha) * varianceX
 
         return (gradientNumerator / gradientDenominator)
 
-    def calculateAlpha(self, df):
+    def calculateAlpha(self, statistics):
 
-        xYorkVariance = df[self.xDiffSq].dropna().sum()
-        yYorkVariance = df[self.yDiffSq].dropna().sum()
+        xYorkVariance = statistics[self.xDiffSq]
+        yYorkVariance = statistics[self.yDiffSq]
 
-        covarianceXY = self.covariance(df, self.x, self.y)
-        varianceX = self.variance(df, self.x)
+        covarianceXY = self.covariance(statistics)
+        varianceX = self.variance(statistics, 'x')
 
-        return math.atan2(covarianceXY ** 2.0 / varianceX ** 2.0 * xYorkVariance, yYorkVariance)
+        return np.arctan2(covarianceXY ** 2.0 / varianceX ** 2.0 * xYorkVariance, yYorkVariance)
 
 class RatioOfMeans(CalibrationBase):
 
-    def slope(self, df):
-        return self.mean(df, self.y) / self.mean(df, self.x)
+    def slope(self, statistics):
+        return self.mean(statistics, 'y') / self.mean(statistics, 'x')
 
 class LeastSquares(CalibrationBase):
 
-    def _slope(self, df):
-        varianceX = self.variance(df, self.x)
-        covarianceXY = self.covariance(df, self.x, self.y)
-        return covarianceXY ** 2.0 / varianceX ** 2.0
-
-    def slope(self, df):
-        A =np.vstack([df[self.x].as_matrix(), np.ones(len(df))]).T
-        slope, residual, rank, s = np.linalg.lstsq(A, df[self.y])
-        return slope[0]
+    def slope(self, statistics):
+        return self.sumOfProducts(statistics, 'x', 'y') / self.variance(statistics, 'x')
 
 class SiteCalibrationCalculator:
 
@@ -178,6 +284,13 @@ class SiteCalibrationCalculator:
 
         return self.calibrate(directionBin, value)
 
+    def turbineValues(self, dataFrame):
+
+        #sectors are looked up by direction bin (NaN for NaN bins and sectors without a calibration)
+        sectors = self.calibrationSectorDataframe.reindex(dataFrame[self.directionBinColumn].values)
+
+        return pd.Series(sectors['Offset'].values + sectors['Slope'].values * dataFrame[self.valueColumn].values, index = dataFrame.index)
+
     def calibrate(self, directionBin, value):
         return self.calibrationSectorDataframe['Offset'][directionBin] + self.calibrationSectorDataframe['Slope'][directionBin] * value
 
@@ -235,6 +348,37 @@ class ShearExponentCalculator:
         
         return shearThreePT
 
+    def calculateMultiPointShears(self, dataFrame):
+
+        if len(self.shearMeasurements) < 1:
+            raise Exception("No shear heights have been defined")
+
+        #least squares slope of log(height) against log(wind speed) over the valid levels of each row
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            windspeeds = np.log(np.column_stack([dataFrame[item.wind_speed_column].values for item in self.shearMeasurements]).astype(float))
+
+        heights = np.log(np.array([item.height for item in self.shearMeasurements], dtype=float))
+
+        valid = ~np.isnan(windspeeds)
+        count = valid.sum(axis=1)
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+            windspeedMeans = np.where(valid, windspeeds, 0.0).sum(axis=1) / count
+            heightMeans = np.where(valid, heights, 0.0).sum(axis=1) / count
+
+            windspeedDeviations = np.where(valid, windspeeds - windspeedMeans[:, np.newaxis], 0.0)
+            heightDeviations = np.where(valid, heights - heightMeans[:, np.newaxis], 0.0)
+
+            windspeedVariance = (windspeedDeviations ** 2).sum(axis=1)
+            shear = windspeedVariance / (windspeedDeviations * heightDeviations).sum(axis=1)
+
+        #equal speeds at every level have no shear
+        shear[windspeedVariance == 0.0] = 0.0
+        shear[count < 2] = np.nan
+
+        return pd.Series(shear, index = dataFrame.index)
+
     def calculateTwoPointShear(self,row):
         # superseded by self.calculateMultiPointShear
         return math.log(row[self.upperColumn] / row[self.lowerColumn]) * self.overOneLogHeightRatio
@@ -242,6 +386,9 @@ class ShearExponentCalculator:
     def shearExponent(self, row):
         return self.calculateMultiPointShear(row)
 
+    def shearExponents(self, dataFrame):
+        return self.calculateMultiPointShears(dataFrame)
+
 
 class Dataset:
 
@@ -257,7 +404,7 @@ class Dataset:
 
         self.set_columns(config)
 
-        dataFrame = self.load_raw_data(config)
+        dataFrame = self.load_raw_data(config, analysisConfig)
         dataFrame = self.load_direction(config, dataFrame)
         dataFrame = self.load_shear(config, dataFrame)
         dataFrame = self.load_inflow(config, dataFrame)        
@@ -297,12 +444,28 @@ class Dataset:
         self.productionByHeight = 'Production By Height'
         self.sensitivityDataColumns = config.sensitivityDataColumns
 
-    def load_raw_data(self, config):
+    def load_raw_data(self, config, analysisConfig):
+
+        columns = self.input_columns(config, analysisConfig, self.read_header(config))
+
+        cache = TimeSeriesCache(config.input_time_series.absolute_path, self.parse_settings(config, columns))
+        dataFrame = cache.load()
+
+        if dataFrame is None:
+
+            with HashingReader(config.input_time_series.absolute_path) as reader:
+                dataFrame = pd.read_csv(reader, index_col=config.timeStamp, dtype={config.timeStamp: str}, \
+                                        sep = getSeparatorValue(config.separator), skiprows = config.headerRows, \
+                                        decimal = getDecimalValue(config.decimal), usecols = columns).replace(config.badData, np.nan)
+
+            #first data record follows the skipped rows and the header line
+            dataFrame.index = parseTimeStamps(dataFrame.index, config.dateFormat, config.headerRows + 2)
+            dataFrame.index.name = config.timeStamp
 
-        dateConverter = lambda x: datetime.datetime.strptime(x, config.dateFormat)
-        dataFrame = pd.read_csv(config.input_time_series.absolute_path, index_col=config.timeStamp, \
-                                parse_dates = True, date_parser = dateConverter, sep = getSeparatorValue(config.separator), \
-                                skiprows = config.headerRows, decimal = getDecimalValue(config.decimal)).replace(config.badData, np.nan)
+            cache.save(dataFrame)
+
+        if config.timeStampAtEndOfPeriod:
+            dataFrame.index = dataFrame.index - pd.Timedelta(seconds = config.timeStepInSeconds)
 
         if config.startDate != None and config.endDate != None:
             dataFrame = dataFrame[config.startDate : config.endDate]
@@ -319,6 +482,101 @@ class Dataset:
 
         return dataFrame
 
+    def read_header(self, config):
+
+        return readColumnHeader(config.input_time_series.absolute_path, config.separator, config.decimal, config.headerRows)
+
+    def input_columns(self, config, analysisConfig, header):
+
+        #columns the loaders below read from the input file, all of which must be present
+        required = [config.timeStamp]
+
+        if config.calculateHubWindSpeed:
+            required += [config.referenceWindSpeed, config.referenceWindDirection, config.turbineLocationWindSpeed]
+        else:
+            required.append(config.hubWindSpeed)
+
+        if config.hubTurbulence != '':
+            required.append(config.hubTurbulence)
+        else:
+            required.append(config.referenceWindSpeedStdDev)
+            if config.turbulenceWSsource == 'Reference':
+                required.append(config.referenceWindSpeed)
+
+        if config.calculateDensity:
+            required += [config.pressure, config.temperature, config.humidity]
+        else:
+            required.append(config.density)
+
+        required += [config.referenceWindDirection, config.inflowAngle, config.power]
+
+        if None not in (config.powerMin, config.powerMax, config.powerSD):
+            required += [config.powerMin, config.powerMax, config.powerSD]
+
+        if len(config.referenceShearMeasurements) > 1:
+            required += [measurement.wind_speed_column for measurement in config.referenceShearMeasurements]
+            if config.shearCalibrationMethod.lower() != 'none':
+                required += [measurement.wind_speed_column for measurement in config.turbineShearMeasurements]
+
+        if config.rewsDefined and analysisConfig.rewsActive:
+            for level in config.rewsProfileLevels:
+                required += [level.wind_speed_column, level.wind_direction_column, level.upflow_column]
+
+        #columns which are only read when present: filters may also refer to derived columns,
+        #and profile levels and sensitivity columns are only used by some analyses
+        optional = [config.turbineAvailabilityCount] + list(config.sensitivityDataColumns)
+
+        for level in config.rewsProfileLevels:
+            optional += [level.wind_speed_column, level.wind_direction_column, level.upflow_column]
+
+        for componentFilter in self.filter_components(config.filters + config.calibrationFilters):
+            if not hasattr(componentFilter, 'startTime'):
+                optional.append(componentFilter.column)
+                if componentFilter.derived:
+                    optional += [factor[0] for factor in componentFilter.value]
+
+        columns = []
+
+        for column in required:
+            if self.valid_column(column) and column not in columns:
+                columns.append(column)
+
+        missing = [column for column in columns if column not in header]
+
+        if len(missing) > 0:
+            text = "The following configured columns are missing from {0}:\n".format(config.input_time_series.absolute_path)
+            for column in missing:
+                text += "- {0}\n".format(column)
+            raise Exception(text)
+
+        for column in optional:
+            if self.valid_column(column) and column in header and column not in columns:
+                columns.append(column)
+
+        return columns
+
+    def filter_components(self, filters):
+
+        components = []
+
+        for componentFilter in filters:
+            if hasattr(componentFilter, 'clauses'):
+                components += componentFilter.clauses
+            else:
+                components.append(componentFilter)
+
+        return components
+
+    def parse_settings(self, config, columns):
+
+        return {'timeStamp': config.timeStamp,
+                'dateFormat': config.dateFormat,
+                'separator': config.separator,
+                'decimal': config.decimal,
+                'headerRows': config.headerRows,
+                'badData': config.badData,
+                'columns': tuple(sorted(columns))}
+
     def finalise_data(self, config, analysisConfig, dataFrame):
 
         self.fullDataFrame = dataFrame.copy()
@@ -357,7 +615,8 @@ class Dataset:
     def load_density(self, config, dataFrame):
 
         if config.calculateDensity:
-            dataFrame[self.hubDensity] = 100.0 * dataFrame[config.pressure] / (273.15 + dataFrame[config.temperature]) / 287.058
+            humidity = dataFrame[config.humidity].values if self.valid_column(config.humidity) else None
+            dataFrame[self.hubDensity] = airDensity(dataFrame[config.pressure].values, dataFrame[config.temperature].values, humidity)
             self.hasDensity = True
         else:
             if config.density != None:
@@ -390,14 +649,14 @@ class Dataset:
             self.verify_column_datatype(dataFrame, measurement.wind_speed_column)
 
         if not self.shearCalibration:
-            dataFrame[self.shearExponent] = dataFrame.apply(ShearExponentCalculator(config.referenceShearMeasurements).shearExponent, axis=1)
+            dataFrame[self.shearExponent] = ShearExponentCalculator(config.referenceShearMeasurements).shearExponents(dataFrame)
         else:
 
-            dataFrame[self.turbineShearExponent] = dataFrame.apply(ShearExponentCalculator(config.turbineShearMeasurements).shearExponent, axis=1)
-            dataFrame[self.referenceShearExponent] = dataFrame.apply(ShearExponentCalculator(config.referenceShearMeasurements).shearExponent, axis=1)
+            dataFrame[self.turbineShearExponent] = ShearExponentCalculator(config.turbineShearMeasurements).shearExponents(dataFrame)
+            dataFrame[self.referenceShearExponent] = ShearExponentCalculator(config.referenceShearMeasurements).shearExponents(dataFrame)
 
             self.shearCalibrationCalculator = self.createShearCalibration(dataFrame ,config, config.timeStepInSeconds)
-            dataFrame[self.shearExponent] = dataFrame.apply(self.shearCalibrationCalculator.turbineValue, axis=1)
+            dataFrame[self.shearExponent] = self.shearCalibrationCalculator.turbineValues(dataFrame)
         
         return dataFrame
 
@@ -469,7 +728,7 @@ class Dataset:
             raise Exception("Reference wind direction column is empty: cannot apply calibration")
 
         self.calibrationCalculator = self.createCalibration(dataFrame, config, config.timeStepInSeconds)
-        dataFrame[self.hubWindSpeed] = dataFrame.apply(self.calibrationCalculator.turbineValue, axis=1)
+        dataFrame[self.hubWindSpeed] = self.calibrationCalculator.turbineValues(dataFrame)
 
         if dataFrame[self.hubWindSpeed].count() < 1:
             raise Exception("Hub wind speed column is empty after application of calibration")
@@ -493,18 +752,13 @@ class Dataset:
             dimensions.append(PowerDeviationMatrixDimension(self.hubWindSpeed, windSpeedBins.centerOfFirstBin, windSpeedBins.binWidth, windSpeedBins.numberOfBins))    
             dimensions.append(PowerDeviationMatrixDimension(self.hubTurbulence, turbulenceBins.centerOfFirstBin, turbulenceBins.binWidth, turbulenceBins.numberOfBins))    
 
-            aggregations = binning.Aggregations(analysisConfig.powerCurveMinimumCount)
-
-            windSpeedBins = binning.Bins(analysisConfig.powerCurveFirstBin, analysisConfig.powerCurveBinSize, analysisConfig.powerCurveLastBin)
-            turbulenceBins = binning.Bins(0.01, 0.01/windSpeedBins.numberOfBins, 0.02)
-            aggregations = binning.Aggregations(analysisConfig.powerCurveMinimumCount)
-
-            dataFrame[windSpeedBin] = dataFrame[self.hubWindSpeed].map(windSpeedBins.binCenter)
-            dataFrame[turbulenceBin] = dataFrame[self.hubTurbulence].map(turbulenceBins.binCenter)
+            dataFrame[windSpeedBin] = windSpeedBins.binCenters(dataFrame[self.hubWindSpeed])
+            dataFrame[turbulenceBin] = turbulenceBins.binCenters(dataFrame[self.hubTurbulence])
 
-            self.residualWindSpeedMatrix = AverageOfDeviationsMatrix(dataFrame[self.residualWindSpeed].groupby([dataFrame[windSpeedBin], dataFrame[turbulenceBin]]).aggregate(aggregations.average),
-                                                                     dataFrame[self.residualWindSpeed].groupby([dataFrame[windSpeedBin], dataFrame[turbulenceBin]]).count(),
-                                                                     dimensions)
+            self.residualWindSpeedMatrix = AverageOfDeviationsMatrix(dataFrame,
+                                                                     self.residualWindSpeed,
+                                                                     dimensions,
+                                                                     analysisConfig.powerCurveMinimumCount)
         else:
 
             self.residualWindSpeedMatrix = None
@@ -602,28 +856,30 @@ class Dataset:
             return siteCalibCalc
             
     def _v_ratio_convergence_check(self):
+
         df = self.filteredCalibrationDataframe[[self.referenceWindSpeed,self.turbineLocationWindSpeed,self.referenceDirectionBin]]
-        conv_check = pd.DataFrame()
-        dirs = df[self.referenceDirectionBin].dropna().unique()
-        dirs.sort()
-        for dir_bin in dirs:
-            Status.add("Checking convergence of %s deg sector" % dir_bin, verbosity=2)
-            sect_df = df[df[self.referenceDirectionBin] == dir_bin].reset_index().loc[:, [self.referenceWindSpeed, self.turbineLocationWindSpeed]]
-            sect_df['vRatio'] = sect_df[self.turbineLocationWindSpeed] / sect_df[self.referenceWindSpeed]
-            sect_df = sect_df[~np.isnan(sect_df['vRatio'])].reset_index()
-            sect_df['rolling_mean_vRatio'] = np.nan
-            for i in range(len(sect_df)):
-                sect_df.loc[i, 'rolling_mean_vRatio'] = sect_df.loc[sect_df.index < i+1, 'vRatio'].mean()
-            sect_df['rolling_mean_vRatio'] /= sect_df.loc[sect_df.index[-1], 'rolling_mean_vRatio']
-            conv_check = pd.concat([conv_check, pd.DataFrame(sect_df['rolling_mean_vRatio']).rename(columns = {'rolling_mean_vRatio':int(dir_bin)})], axis = 1)
-        conv_check.index += 1
+
+        sectors = pd.DataFrame({'direction': df[self.referenceDirectionBin],
+                                'vRatio': df[self.turbineLocationWindSpeed] / df[self.referenceWindSpeed]})
+        sectors = sectors.dropna()
+
+        Status.add("Checking convergence of %d sectors" % sectors['direction'].nunique(), verbosity=2)
+
+        #running mean of each sector normalised by the mean of the whole sector
+        groups = sectors.groupby('direction')['vRatio']
+        sectors['count'] = groups.cumcount() + 1
+        sectors['rolling_mean_vRatio'] = groups.cumsum() / sectors['count']
+        sectors['rolling_mean_vRatio'] /= sectors.groupby('direction')['rolling_mean_vRatio'].transform('last')
+        sectors['direction'] = sectors['direction'].astype(int)
+
+        conv_check = sectors.pivot(index='count', columns='direction', values='rolling_mean_vRatio')
+        conv_check.index.name = None
+        conv_check.columns.name = None
+
         self.calibrationSectorConverge = conv_check
         if len(self.calibrationSectorConverge) >= 144:
-            conv_check_summary = pd.DataFrame(index = self.calibrationSectorConverge.columns, columns = ['rolling_mean_vRatio_8hrs','rolling_mean_vRatio_16hrs','rolling_mean_vRatio_24hrs'])
-            for dir_bin in self.calibrationSectorConverge.columns:
-                conv_check_summary.loc[dir_bin, 'rolling_mean_vRatio_8hrs'] = self.calibrationSectorConverge.loc[48, dir_bin]
-                conv_check_summary.loc[dir_bin, 'rolling_mean_vRatio_16hrs'] = self.calibrationSectorConverge.loc[96, dir_bin]
-                conv_check_summary.loc[dir_bin, 'rolling_mean_vRatio_24hrs'] = self.calibrationSectorConverge.loc[144, dir_bin]
+            conv_check_summary = self.calibrationSectorConverge.loc[[48, 96, 144]].T.astype(object)
+            conv_check_summary.columns = ['rolling_mean_vRatio_8hrs','rolling_mean_vRatio_16hrs','rolling_mean_vRatio_24hrs']
             self.calibrationSectorConvergeSummary = conv_check_summary
 
     def getCalibrationMethod(self,calibrationMethod,referenceColumn, turbineLocationColumn, timeStepInSeconds, dataFrame):
@@ -639,43 +895,31 @@ class Dataset:
 
     def createSiteCalibrationCalculator(self,dataFrame, valueColumn, calibration ):
 
-        groups = dataFrame[calibration.requiredColumns].groupby(dataFrame[self.referenceDirectionBin])
-
-        slopes = {}
-        intercepts = {}
-        counts = {}
-        belowAbove = {}
-        sigA = {}
-        sigB = {}
-        cov  = {}
-        corr  = {}
-        vRatio= {}
-
-        for group in groups:
-
-            directionBinCenter = group[0]
-            sectorDataFrame = group[1].dropna()
-            if len(sectorDataFrame.index)>1:
-                slopes[directionBinCenter] = calibration.slope(sectorDataFrame)
-                intercepts[directionBinCenter] = calibration.intercept(sectorDataFrame, slopes[directionBinCenter])
-                counts[directionBinCenter] = sectorDataFrame[valueColumn].count()
-                try:
-                    sigA[directionBinCenter] = calibration.sigA(sectorDataFrame,slopes[directionBinCenter], intercepts[directionBinCenter], counts[directionBinCenter]) # 'ErrInGradient'
-                    sigB[directionBinCenter] = calibration.sigB(sectorDataFrame,slopes[directionBinCenter], intercepts[directionBinCenter], counts[directionBinCenter]) # 'ErrInIntercept'
-                    #cov[directionBinCenter]  = calibration.covariance(sectorDataFrame, calibration.x,calibration.y )
-                    cov[directionBinCenter]  = sigA[directionBinCenter]*sigB[directionBinCenter]*(-1.0 * sectorDataFrame[calibration.x].sum())/((counts[directionBinCenter] * (sectorDataFrame[calibration.x]**2).sum())**0.5)
-                    corr[directionBinCenter]  =sectorDataFrame[[calibration.x, calibration.y]].corr()[calibration.x][calibration.y]
-                    vRatio[directionBinCenter] = (sectorDataFrame[calibration.y]/sectorDataFrame[calibration.x]).mean()# T_A1/R_A1 - this is currently mean of all data
-                except:
-                    pass
-
-                if valueColumn == self.hubWindSpeedForTurbulence:
-                    belowAbove[directionBinCenter] = (sectorDataFrame[sectorDataFrame[valueColumn] <= 8.0][valueColumn].count(),sectorDataFrame[sectorDataFrame[valueColumn] > 8.0][valueColumn].count())
-                
-        calibrationSectorDataframe = pd.DataFrame([slopes,intercepts,counts, sigA, sigB, cov, corr, vRatio], ["Slope","Offset","Count","SigA","SigB","Cov","Corr","vRatio"] ).T
-        
-        if len(belowAbove.keys()):
-            calibrationSectorDataframe['belowAbove'] = pd.Series(belowAbove)
+        statistics = calibration.sectorStatistics(dataFrame, self.referenceDirectionBin)
+        statistics = statistics[statistics['count'] > 1]
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+            slopes = calibration.slope(statistics)
+            intercepts = calibration.intercept(statistics, slopes)
+            sigA = calibration.sigA(statistics, slopes, intercepts) # 'ErrInGradient'
+            sigB = calibration.sigB(statistics, slopes, intercepts) # 'ErrInIntercept'
+            cov = sigA * sigB * (-1.0 * statistics['x']) / ((statistics['count'] * statistics['xx']) ** 0.5)
+            corr = calibration.correlation(statistics)
+            vRatio = calibration.mean(statistics, 'yOverX') # T_A1/R_A1 - this is currently mean of all data
+
+        calibrationSectorDataframe = pd.DataFrame({"Slope": slopes,
+                                                   "Offset": intercepts,
+                                                   "Count": statistics['count'].astype(float),
+                                                   "SigA": sigA,
+                                                   "SigB": sigB,
+                                                   "Cov": cov,
+                                                   "Corr": corr,
+                                                   "vRatio": vRatio}, columns = ["Slope","Offset","Count","SigA","SigB","Cov","Corr","vRatio"])
+        calibrationSectorDataframe.index.name = None
+
+        if valueColumn == self.hubWindSpeedForTurbulence and len(statistics) > 0:
+            calibrationSectorDataframe['belowAbove'] = pd.Series(zip(statistics['below'], statistics['above']), index = statistics.index)
 
         return SiteCalibrationCalculator(self.referenceDirectionBin, valueColumn, calibrationSectorDataframe)
 
@@ -685,21 +929,41 @@ class Dataset:
 
     def excludeData(self, dataFrame, config):
 
-        mask = pd.Series([True]*len(dataFrame),index=dataFrame.index)
-        Status.add("Data set length prior to exclusions: {0}".format(len(mask[mask])), verbosity=2)
+        Status.add("Data set length prior to exclusions: {0}".format(len(dataFrame)), verbosity=2)
 
-        for exclusion in config.exclusions:
+        exclusions = [exclusion for exclusion in config.exclusions if exclusion.active]
 
-            startDate = exclusion.startDate
-            endDate = exclusion.endDate
-            active = exclusion.active
+        #binary search the exclusion periods (inclusive at both ends) in the sorted time stamps
+        timeStamps = dataFrame[self.timeStamp].values.astype('datetime64[ns]').view(np.int64)
+        order = np.argsort(timeStamps, kind='mergesort')
+        timeStamps = timeStamps[order]
 
-            if active:
-                subMask = (dataFrame[self.timeStamp] >= startDate) & (dataFrame[self.timeStamp] <= endDate)
-                mask = mask & ~subMask
-                Status.add("Applied exclusion: {0} to {1}\n\t- data set length: {2}".format(exclusion.startDate.strftime("%Y-%m-%d %H:%M"),exclusion.endDate.strftime("%Y-%m-%d %H:%M"),len(mask[mask])), verbosity=2)
+        starts = np.array([pd.Timestamp(exclusion.startDate).value for exclusion in exclusions], dtype=np.int64)
+        ends = np.array([pd.Timestamp(exclusion.endDate).value for exclusion in exclusions], dtype=np.int64)
 
-        Status.add("Data set length after exclusions: {0}".format(len(mask[mask])), verbosity=2)
+        counts = np.maximum(np.searchsorted(timeStamps, ends, side='right') - np.searchsorted(timeStamps, starts, side='left'), 0)
+
+        for exclusion, count in zip(exclusions, counts):
+            Status.add("Applied exclusion: {0} to {1}\n\t- records in period: {2}".format(exclusion.startDate.strftime("%Y-%m-%d %H:%M"),exclusion.endDate.strftime("%Y-%m-%d %H:%M"),count), verbosity=3)
+
+        starts, ends = mergeIntervals(starts, ends)
+
+        first = np.searchsorted(timeStamps, starts, side='left')
+        last = np.searchsorted(timeStamps, ends, side='right')
+
+        for start, end, count in zip(starts, ends, last - first):
+            Status.add("Excluded {0} to {1}: {2} records".format(pd.Timestamp(start).strftime("%Y-%m-%d %H:%M"), pd.Timestamp(end).strftime("%Y-%m-%d %H:%M"), count), verbosity=2)
+
+        #mark the excluded runs of the sorted time stamps, then map back to the original row order
+        changes = np.zeros(len(timeStamps) + 1, dtype=np.int64)
+        np.add.at(changes, first, 1)
+        np.add.at(changes, last, -1)
+
+        mask = np.ones(len(timeStamps), dtype=bool)
+        mask[order] = np.cumsum(changes[:-1]) == 0
+
+        Status.add("Merged {0} active exclusions into {1} periods".format(len(exclusions), len(starts)), verbosity=2)
+        Status.add("Data set length after exclusions: {0}".format(mask.sum()), verbosity=2)
 
         return dataFrame[mask]
 
@@ -770,91 +1034,102 @@ class Dataset:
 
 
     def createDerivedColumn(self,df,cols):
-        d = df.copy()
-        d['Derived'] = 1
-        for col in cols:
-            d['Derived'] *= ((df[col[0]]*float(col[1]))+float(col[2]))**float(col[3])
-        return d['Derived']
 
-    def applyToDFilter(self,mask,componentFilter,dataFrame):
+        #product of (column * A + B) ^ C terms evaluated on the column arrays
+        derived = np.ones(len(df))
+
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            for col in cols:
+                derived *= ((df[col[0]].values*float(col[1]))+float(col[2]))**float(col[3])
+
+        return derived
+
+    def derivedColumn(self, dataFrame, cols, derivedColumns):
 
-        startTime = (dataFrame.index - datetime.timedelta(seconds=self.timeStepInSeconds))
-        endTime =  dataFrame.index
+        #filters with the same derived definition share one evaluation
+        key = tuple((col[0], float(col[1]), float(col[2]), float(col[3])) for col in cols)
+
+        if key not in derivedColumns:
+            derivedColumns[key] = self.createDerivedColumn(dataFrame, cols)
+
+        return derivedColumns[key]
+
+    def filterMask(self, componentFilter, dataFrame, derivedColumns):
+
+        if hasattr(componentFilter, "startTime"):
+            return self.timeOfDayFilterMask(componentFilter, dataFrame)
+        elif hasattr(componentFilter, "clauses"):
+            return self.relationshipFilterMask(componentFilter, dataFrame, derivedColumns)
+        else:
+            return self.simpleFilterMask(componentFilter, dataFrame, derivedColumns)
+
+    def timeOfDayFilterMask(self, componentFilter, dataFrame):
+
+        if not isinstance(dataFrame.index, pd.DatetimeIndex):
+            raise Exception("Time of day filters require a time stamp index")
 
         # explicit assumption is that we're using end format data.
-        dayMask = dataFrame[self.timeStamp].apply(lambda x,d : True if x.isoweekday() in d else False, args=[componentFilter.daysOfTheWeek] )
-        todMask = np.logical_and( startTime.time >= componentFilter.startTime.time(),
-                                  endTime.time   <= componentFilter.endTime.time() )
+        endTime = np.mod(dataFrame.index.asi8, NanosecondsPerDay)
+        startTime = np.mod(endTime - self.timeStepInSeconds * 10 ** 9, NanosecondsPerDay)
 
-        if len(componentFilter.months) > 0:
-            monthMask = dataFrame[self.timeStamp].apply(lambda x,d : True if x.month in d else False, args=[componentFilter.months] )
-            dayMask = dayMask & monthMask
-        totalMask = dayMask & todMask
-        mask = mask | totalMask
+        windowStart = timeOfDayInNanoseconds(componentFilter.startTime)
+        windowEnd = timeOfDayInNanoseconds(componentFilter.endTime)
+
+        if windowStart <= windowEnd:
+            todMask = (startTime >= windowStart) & (endTime <= windowEnd)
+        else:
+            #window wraps around midnight
+            todMask = ((startTime >= windowStart) | (startTime <= windowEnd)) & ((endTime >= windowStart) | (endTime <= windowEnd))
 
-        Status.add("Applied filter: {0}".format(componentFilter), verbosity=2)
+        timeStamps = pd.DatetimeIndex(dataFrame[self.timeStamp])
+        dayMask = np.in1d(timeStamps.dayofweek + 1, componentFilter.daysOfTheWeek)
 
-        return mask.copy()
+        if len(componentFilter.months) > 0:
+            dayMask &= np.in1d(timeStamps.month, componentFilter.months)
+
+        return dayMask & todMask
 
-    def applySimpleFilter(self,mask,componentFilter,dataFrame):
+    def simpleFilterMask(self, componentFilter, dataFrame, derivedColumns):
 
-        filterColumn = componentFilter.column
-        filterType = componentFilter.filterType
+        values = dataFrame[componentFilter.column].values
+        filterType = componentFilter.filterType.lower()
         filterInclusive = componentFilter.inclusive
 
         if not componentFilter.derived:
             filterValue = componentFilter.value
         else:
-            filterValue = self.createDerivedColumn(dataFrame,componentFilter.value)
+            filterValue = self.derivedColumn(dataFrame, componentFilter.value, derivedColumns)
 
-        if filterType.lower() == "below":
-             mask = self.addFilterBelow(dataFrame, mask, filterColumn, filterValue, filterInclusive)
+        with np.errstate(invalid = 'ignore'):
 
-        elif filterType.lower() == "above":
-            mask = self.addFilterAbove(dataFrame, mask, filterColumn, filterValue, filterInclusive)
+            if filterType == "below":
+                return self.belowMask(values, filterValue, filterInclusive)
 
-        elif filterType.lower() == "aboveorbelow" or filterType.lower() == "notequal":
-            mask = self.addFilterBelow(dataFrame, mask, filterColumn, filterValue, filterInclusive)
-            mask = self.addFilterAbove(dataFrame, mask, filterColumn, filterValue, filterInclusive)
+            elif filterType == "above":
+                return self.aboveMask(values, filterValue, filterInclusive)
 
-        else:
-            raise Exception("Filter type not recognised: %s" % filterType)
-
-        message = "Applied Filter:{col}-{typ}-{val}\n\tData set length:{leng}".format(
-                                col=filterColumn,typ=filterType,val="Derived Column" if type(filterValue) == pd.Series else filterValue,leng=len(mask[~mask]))
-        
-        Status.add(message, verbosity=2)
+            elif filterType == "aboveorbelow" or filterType == "notequal":
+                return self.belowMask(values, filterValue, filterInclusive) | self.aboveMask(values, filterValue, filterInclusive)
 
-        return mask.copy()
+            else:
+                raise Exception("Filter type not recognised: %s" % componentFilter.filterType)
 
-    def applyRelationshipFilter(self, mask, componentFilter, dataFrame):
+    def relationshipFilterMask(self, componentFilter, dataFrame, derivedColumns):
 
         filterConjunction = componentFilter.conjunction
 
         if filterConjunction not in ("AND","OR"):
             raise NotImplementedError("Filter conjunction not implemented, please use AND or OR...")
 
-        filterConjuction = np.logical_or if filterConjunction == "OR" else np.logical_and
-
-        masks = []
-        newMask = pd.Series([False]*len(mask),index=mask.index)
-
         if len(componentFilter.clauses) < 2:
             raise Exception("Number of clauses in a relationship must be > 1")
 
-        for filter in componentFilter.clauses:
-            filterMask = self.applySimpleFilter(newMask,filter,dataFrame)
-            masks.append(filterMask)
-
-        baseMask = masks[0]
-        for filterMask in masks[1:]:
-            baseMask = filterConjuction(baseMask,filterMask) # only if commutative (e.g. AND / OR)
-
-        mask = np.logical_or(mask,baseMask)
-        Status.add("Applied Relationship (AND/OR) Filter:\n\tData set length:{leng}".format(leng=len(mask[~mask])), verbosity=2)
-
-        return mask.copy()
+        masks = [self.simpleFilterMask(clause, dataFrame, derivedColumns) for clause in componentFilter.clauses]
 
+        if filterConjunction == "OR":
+            return np.logical_or.reduce(masks)
+        else:
+            return np.logical_and.reduce(masks)
 
     def filterDataFrame(self, dataFrame, filters):
 
@@ -869,50 +1144,72 @@ class Dataset:
                 componentFilter.write_summary()
 
         Status.add("", verbosity=2)
-
-        mask = pd.Series([False]*len(dataFrame),index=dataFrame.index)
-
-        Status.add("Data set length prior to filtering: {0}".format(len(mask[~mask])), verbosity=2)
+        Status.add("Data set length prior to filtering: {0}".format(len(dataFrame)), verbosity=2)
         Status.add("", verbosity=2)
 
+        #compile each filter to its own mask of the records it removes, then combine them in one pass
+        appliedFilters = []
+        masks = []
+        derivedColumns = {}
+
         for componentFilter in filters:
 
             if componentFilter.active:
                 if not componentFilter.applied:
                     try:
-                        
-                        if hasattr(componentFilter,"startTime"):
-                            mask = self.applyToDFilter(mask,componentFilter,dataFrame)
-                        elif hasattr(componentFilter, "clauses"):
-                            mask = self.applyRelationshipFilter(mask, componentFilter, dataFrame)
-                        else:
-                            mask = self.applySimpleFilter(mask,componentFilter,dataFrame)
-                        
-                        Status.add("{0} to {1}".format(dataFrame[~mask][self.timeStamp].min(), dataFrame[~mask][self.timeStamp].max()))
+                        masks.append(self.filterMask(componentFilter, dataFrame, derivedColumns))
+                        appliedFilters.append(componentFilter)
                         componentFilter.applied = True
 
                     except Exception as exception:
-                        
-                        Status.add("Cannot apply filter {0}: {1}".format(componentFilter, exception))                      
+
+                        Status.add("Cannot apply filter {0}: {1}".format(componentFilter, exception))
                         componentFilter.applied = False
 
+        if len(masks) > 0:
+
+            masks = np.vstack(masks)
+            mask = masks.any(axis=0)
+
+            #each removed record is attributed incrementally to the first filter which removes it
+            removedAlone = masks.sum(axis=1)
+            removedIncrementally = np.bincount(masks.argmax(axis=0)[mask], minlength=len(appliedFilters))
+
+            Status.add("Filter\tRemoved Alone\tRemoved Incrementally", verbosity=2)
+
+            for i in range(len(appliedFilters)):
+                appliedFilters[i].removedAlone = int(removedAlone[i])
+                appliedFilters[i].removedIncrementally = int(removedIncrementally[i])
+                Status.add("{0}\t{1}\t{2}".format(appliedFilters[i], removedAlone[i], removedIncrementally[i]), verbosity=2)
+
+        else:
+
+            mask = np.zeros(len(dataFrame), dtype=bool)
+
+        dataFrame = dataFrame[~mask]
+
+        Status.add("Data set length after filtering: {0}".format(len(dataFrame)), verbosity=2)
+
+        if len(appliedFilters) > 0:
+            Status.add("{0} to {1}".format(dataFrame[self.timeStamp].min(), dataFrame[self.timeStamp].max()))
+
         Status.add("", verbosity=2)
 
-        return dataFrame[~mask]
+        return dataFrame
 
-    def addFilterBelow(self, dataFrame, mask, filterColumn, filterValue, filterInclusive):
+    def belowMask(self, values, filterValue, filterInclusive):
 
         if filterInclusive:
-            return mask | (dataFrame[filterColumn] <= filterValue)
+            return values <= filterValue
         else:
-            return mask | (dataFrame[filterColumn] < filterValue)
+            return values < filterValue
 
-    def addFilterAbove(self, dataFrame, mask, filterColumn, filterValue, filterInclusive):
+    def aboveMask(self, values, filterValue, filterInclusive):
 
         if filterInclusive:
-            return mask | (dataFrame[filterColumn] >= filterValue)
+            return values >= filterValue
         else:
-            return mask | (dataFrame[filterColumn] > filterValue)
+            return values > filterValue
 
     def valid_column(self, column):
         
@@ -970,7 +1267,7 @@ class Dataset:
 
         rotorEquivalentWindSpeed = rews.RotorEquivalentWindSpeed(profileLevels, self.rotor, profileHubWindSpeedCalculator, rewsVeer, rewsUpflow, rewsExponent)
 
-        dataFrame[self.rewsToHubRatio] = dataFrame.apply(rotorEquivalentWindSpeed.rewsToHubRatio, axis=1)
+        dataFrame[self.rewsToHubRatio] = rotorEquivalentWindSpeed.rewsToHubRatios(dataFrame)
 
         return dataFrame
 
@@ -982,6 +1279,6 @@ class Dataset:
 
         rotorEquivalentWindSpeed = rews.ProductionByHeight(profileLevels, self.rotor, profileHubWindSpeedCalculator, power_curve)
 
-        self.dataFrame[self.productionByHeight] = self.dataFrame.apply(rotorEquivalentWindSpeed.calculate, axis=1)
+        self.dataFrame[self.productionByHeight] = rotorEquivalentWindSpeed.calculateValues(self.dataFrame)
 
         return self.dataFrame[self.productionByHeight]
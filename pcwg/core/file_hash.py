@@ -0,0 +1,89 @@
+import os
+import hashlib
+
+ChunkSize = 1024 * 1024
+Whitespace = ' \t\n\r\x0b\x0c'
+
+#digests by (path, size, mtime) so a file is only hashed once per process
+memo = {}
+
+class FileHash(object):
+
+    #sha1 of the raw contents and of the contents with all whitespace removed (the provenance id)
+
+    def __init__(self):
+
+        self.raw = hashlib.sha1()
+        self.stripped = hashlib.sha1()
+
+    def update(self, data):
+
+        self.raw.update(data)
+        self.stripped.update(data.translate(None, Whitespace))
+
+    def digests(self):
+        return self.raw.hexdigest(), self.stripped.hexdigest()
+
+def file_key(path):
+
+    stat = os.stat(path)
+
+    return (os.path.abspath(path), stat.st_size, stat.st_mtime)
+
+def file_digests(path):
+
+    key = file_key(path)
+
+    if key not in memo:
+
+        fileHash = FileHash()
+
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(ChunkSize), ''):
+                fileHash.update(chunk)
+
+        memo[key] = fileHash.digests()
+
+    return memo[key]
+
+class HashingReader(object):
+
+    #file wrapper which hashes the contents as they are read (e.g. by read_csv) so parsing and hashing share one pass
+
+    def __init__(self, path):
+
+        self.key = file_key(path)
+        self.file = open(path, 'rb')
+        self.hash = FileHash()
+
+    def read(self, size = -1):
+
+        data = self.file.read(size)
+        self.hash.update(data)
+
+        return data
+
+    def readline(self, size = -1):
+
+        data = self.file.readline(size)
+        self.hash.update(data)
+
+        return data
+
+    def __iter__(self):
+        return iter(self.readline, '')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exceptionType, exception, trace):
+
+        if exceptionType is None:
+
+            #hash whatever the parser did not consume before memoising the digests
+            for chunk in iter(lambda: self.read(ChunkSize), ''):
+                pass
+
+            memo[self.key] = self.hash.digests()
+
+        self.file.close()
@@ -4,6 +4,12 @@ from math import pow, sqrt
 
 from ..core.status import Status
 
+def scalar_or_array(x, values):
+    if np.ndim(x) == 0:
+        return float(values)
+    else:
+        return values
+
 class BaseInterpolator(object):
 
     def write_summary(self, x, y):
@@ -413,17 +419,14 @@ class MarmanderPowerCurveInterpolator(BaseInterpolator):
             
     def integrate_partition(self, f, start, end):
         
-        integrated_power = 0.0
-        wind_speed = start
         step = 0.01
-        count = 0
-        
-        while wind_speed <= end:
-            integrated_power += f(wind_speed)
-            wind_speed += step
-            count += 1
+        steps = int((end - start) / step) + 2
 
-        return integrated_power / float(count)
+        #accumulate steps (rather than multiply) to reproduce the sampled speeds exactly
+        wind_speeds = np.cumsum(np.concatenate(([start], np.repeat(step, steps))))
+        wind_speeds = wind_speeds[wind_speeds <= end]
+
+        return np.sum(f(wind_speeds)) / float(len(wind_speeds))
         
     def prepareDebugText(self, binCenters, binLimits, binAverages, adjustedBinPowers, adjust, intergatedPowers, errors, f):
 
@@ -522,13 +525,12 @@ class MarmanderPowerCurveInterpolatorCubicFunction:
         
     def __call__(self, x):
 
-        if x < self.cutInWindSpeed or x > self.cutOutWindSpeed:
-            return 0.0
-        else:
-            if x < self.ratedWindSpeed:
-                return float(self.cubicInterpolator(x))
-            else:
-                return float(self.linearInterpolator(x))
+        x_values = np.asarray(x, dtype=float)
+
+        power = np.where(x_values < self.ratedWindSpeed, self.cubicInterpolator(x_values), self.linearInterpolator(x_values))
+        power = np.where((x_values < self.cutInWindSpeed) | (x_values > self.cutOutWindSpeed), 0.0, power)
+
+        return scalar_or_array(x, power)
     
 class CubicPowerCurveInterpolator(BaseInterpolator):
 
@@ -549,13 +551,13 @@ class CubicPowerCurveInterpolator(BaseInterpolator):
                 highestNonZero = x[i]
         
     def __call__(self, x):
-        if x > self.cutOutWindSpeed:
-            return 0.0
-        else:
-            if x > self.lastCubicWindSpeed:
-                return float(self.linearInterpolator(x))
-            else:
-                return float(self.cubicInterpolator(x))
+
+        x_values = np.asarray(x, dtype=float)
+
+        power = np.where(x_values > self.lastCubicWindSpeed, self.linearInterpolator(x_values), self.cubicInterpolator(x_values))
+        power = np.where(x_values > self.cutOutWindSpeed, 0.0, power)
+
+        return scalar_or_array(x, power)
 
 class LinearPowerCurveInterpolator(BaseInterpolator):
 
@@ -566,10 +568,12 @@ class LinearPowerCurveInterpolator(BaseInterpolator):
         self.cutOutWindSpeed = cutOutWindSpeed
         
     def __call__(self, x):
-        if x > self.cutOutWindSpeed:
-            return 0.0
-        else:
-            return float(self.interpolator(x))
+
+        x_values = np.asarray(x, dtype=float)
+
+        power = np.where(x_values > self.cutOutWindSpeed, 0.0, self.interpolator(x_values))
+
+        return scalar_or_array(x, power)
     
 class LinearTurbulenceInterpolator:
 
@@ -577,5 +581,5 @@ class LinearTurbulenceInterpolator:
         self.interpolator = interpolate.interp1d(x, y, kind='linear',fill_value=0.0,bounds_error=False)
 
     def __call__(self, x):
-        return float(self.interpolator(x))
+        return scalar_or_array(x, self.interpolator(x))
     
@@ -1,53 +1,135 @@
+import numpy as np
+
 from binning import Bins
 
 class BaseDeviationMatrix(object):
 
 	TOLERANCE = 0.00000000001
 	
-	def __init__(self, count_matrix, dimensions):
+	def __init__(self, data_frame, dimensions):
 
-		self.count_matrix = count_matrix
 		self.dimensions = dimensions
+		self.shape = tuple(dimension.bins.numberOfBins for dimension in dimensions)
+		self.size = int(np.prod(self.shape))
 
-	def get_2D_value_from_matrix(self, matrix, center1, center2):
+		self.cells = self.calculate_cells(data_frame)
+		self.record_counts = np.bincount(self.cells[self.cells >= 0], minlength=self.size).reshape(self.shape)
 
-		if len(self.dimensions) != 2:
-			raise Exception("Dimensionality of power deviation matrix is not 2")
+		self._deviation_matrix = None
+		self._count_matrix = None
 
-		first_dimension = self.dimensions[0]
-		second_dimension = self.dimensions[1]
+	def calculate_cells(self, data_frame):
 
-		for i in range(first_dimension.bins.numberOfBins): 
-			
-			matched_center1 = first_dimension.bins.binCenterByIndex(i)
+		#flattened cell index of each record (-1 where any dimension is NaN or out of range)
+
+		valid = np.ones(len(data_frame), dtype=bool)
+		indices = []
+
+		for dimension, number_of_bins in zip(self.dimensions, self.shape):
+			index = dimension.bin_indices(data_frame)
+			with np.errstate(invalid = 'ignore'):
+				valid &= (index >= 0) & (index < number_of_bins)
+			indices.append(index)
+
+		cells = np.full(len(data_frame), -1, dtype=int)
+
+		if valid.any():
+			cells[valid] = np.ravel_multi_index([index[valid].astype(int) for index in indices], self.shape)
+
+		return cells
+
+	def sum_and_count(self, values):
+
+		values = np.asarray(values, dtype=float)
+		mask = (self.cells >= 0) & ~np.isnan(values)
+
+		sums = np.bincount(self.cells[mask], weights=values[mask], minlength=self.size).reshape(self.shape)
+		counts = np.bincount(self.cells[mask], minlength=self.size).reshape(self.shape)
+
+		return (sums, counts)
+
+	def average(self, sums, counts, minimum_count):
+
+		#(bincount returns integer sums when no records fall in the matrix)
+		with np.errstate(divide = 'ignore', invalid = 'ignore'):
+			means = np.asarray(sums, dtype=float) / counts
+
+		means[(counts < minimum_count) | (counts == 0)] = np.nan
+
+		return means
+
+	@property
+	def deviation_matrix(self):
+
+		if self._deviation_matrix is None:
+			self._deviation_matrix = self.nested_view(self.deviations)
+
+		return self._deviation_matrix
+
+	@property
+	def count_matrix(self):
 
-			if self.match(matched_center1, center1):
+		if self._count_matrix is None:
+			self._count_matrix = self.nested_view(self.counts)
 
-				if not matched_center1 in self.deviation_matrix:
-					raise Exception("Matched center not found in matrix: {0}".format(center1))
+		return self._count_matrix
 
-				matrix_slice = matrix[matched_center1]
+	def nested_view(self, matrix):
 
-				for j in range(second_dimension.bins.numberOfBins): 
+		#nested dictionaries keyed by bin center (e.g. view[wind_speed][turbulence]) for populated cells
+		
+		view = {}
+
+		for cell in zip(*np.nonzero(self.record_counts)):
+
+			centers = [dimension.bins.binCenterByIndex(index) for dimension, index in zip(self.dimensions, cell)]
+
+			node = view
+
+			for center in centers[:-1]:
+				node = node.setdefault(center, {})
+
+			node[centers[-1]] = matrix[cell]
+
+		return view
+
+	def get_cell(self, centers):
+
+		if len(centers) != len(self.dimensions):
+			raise Exception("Dimensionality of power deviation matrix is not {0}".format(len(centers)))
+
+		cell = []
+
+		for dimension, center in zip(self.dimensions, centers):
+			
+			index = int(round((center - dimension.bins.centerOfFirstBin) / dimension.bins.binWidth))
+
+			if index < 0 or index >= dimension.bins.numberOfBins or not self.match(dimension.bins.binCenterByIndex(index), center):
+				raise Exception("Cannot match matrix bin: {0}".format(", ".join(str(center) for center in centers)))
+
+			cell.append(index)
 
-					matched_center2 = second_dimension.bins.binCenterByIndex(j)
+		cell = tuple(cell)
 
-					if self.match(matched_center2, center2):
+		if self.record_counts[cell] < 1:
+			raise Exception("Matched center not found in matrix: {0}".format(", ".join(str(center) for center in centers)))
 
-						if not matched_center2 in matrix_slice:
-							raise Exception("Matched center not found in matrix: {0}".format(center2))
+		return cell
 
-						return matrix_slice[matched_center2]
+	def get_2D_value_from_matrix(self, matrix, center1, center2):
 
-		raise Exception("Cannot match matrix bin: {0}, {1}".format(center1, center2))	
+		if len(self.dimensions) != 2:
+			raise Exception("Dimensionality of power deviation matrix is not 2")
+
+		return matrix[self.get_cell((center1, center2))]
 
 	def get_2D_value(self, center1, center2):
 		
-		return self.get_2D_value_from_matrix(self.deviation_matrix, center1, center2)
+		return self.get_2D_value_from_matrix(self.deviations, center1, center2)
 
 	def get_2D_count(self, center1, center2):
 		
-		return self.get_2D_value_from_matrix(self.count_matrix, center1, center2)
+		return self.get_2D_value_from_matrix(self.counts, center1, center2)
 
 	def match(self, value1, value2):
 
@@ -55,19 +137,26 @@ class BaseDeviationMatrix(object):
 
 class AverageOfDeviationsMatrix(BaseDeviationMatrix):
     
-	def __init__(self, deviation_matrix, count_matrix, dimensions):
+	def __init__(self, data_frame, deviation_column, dimensions, minimum_count = 0):
 
-		BaseDeviationMatrix.__init__(self, count_matrix, dimensions)
+		BaseDeviationMatrix.__init__(self, data_frame, dimensions)
 
-		self.deviation_matrix = deviation_matrix
+		self.sums, self.counts = self.sum_and_count(data_frame[deviation_column])
+		self.deviations = self.average(self.sums, self.counts, minimum_count)
 
 class DeviationOfAveragesMatrix(BaseDeviationMatrix):
 
-	def __init__(self, actual_matrix, modelled_matrix, count_matrix, dimensions):
+	def __init__(self, data_frame, actual_column, modelled_column, dimensions, minimum_count = 0):
+
+		BaseDeviationMatrix.__init__(self, data_frame, dimensions)
+
+		self.actual_sums, self.actual_counts = self.sum_and_count(data_frame[actual_column])
+		self.sums, self.counts = self.sum_and_count(data_frame[modelled_column])
 
-		BaseDeviationMatrix.__init__(self, count_matrix, dimensions)
+		self.actual_means = self.average(self.actual_sums, self.actual_counts, minimum_count)
+		self.modelled_means = self.average(self.sums, self.counts, minimum_count)
 
-		self.deviation_matrix = (actual_matrix - modelled_matrix) / modelled_matrix
+		self.deviations = (self.actual_means - self.modelled_means) / self.modelled_means
 
 class PowerDeviationMatrixDimension(object):
 
@@ -82,4 +171,8 @@ class PowerDeviationMatrixDimension(object):
 
 	def create_column(self, dataFrame):
 
-		return dataFrame[self.parameter].map(self.bins.binCenter)
+		return self.bins.binCenters(dataFrame[self.parameter])
+
+	def bin_indices(self, dataFrame):
+
+		return self.bins.binIndices(dataFrame[self.parameter])
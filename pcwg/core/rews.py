@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from scipy import interpolate
 
 class NoneInterpolator:
@@ -6,6 +7,50 @@ class NoneInterpolator:
     def __call__(self, level):
         return None
 
+class ProfileInterpolation:
+
+    #linear interpolation (as interp1d) from measured profile heights to fixed target heights,
+    #with the bracketing heights of each target precomputed so every row can be interpolated at once
+
+    def __init__(self, levels_dict, target_heights):
+
+        #levels without a column are ignored and, as with the row-wise interpolator, at least three levels are required
+        heights = sorted(height for height in levels_dict if levels_dict[height] is not None)
+        
+        self.columns = [levels_dict[height] for height in heights]
+        self.heights = np.array(heights, dtype=float)
+
+        self.defined = (len(heights) >= 3)
+
+        if not self.defined:
+            return
+
+        targets = np.array(target_heights, dtype=float)
+
+        if (targets < self.heights[0]).any():
+            raise ValueError("A value in x_new is below the interpolation range.")
+
+        if (targets > self.heights[-1]).any():
+            raise ValueError("A value in x_new is above the interpolation range.")
+
+        self.upper = np.searchsorted(self.heights, targets).clip(1, len(self.heights) - 1)
+        self.lower = self.upper - 1
+
+        self.spans = self.heights[self.upper] - self.heights[self.lower]
+        self.offsets = targets - self.heights[self.lower]
+
+    def __call__(self, dataFrame):
+
+        if not self.defined:
+            return None
+
+        values = dataFrame[self.columns].values.astype(float)
+
+        lower = values[:, self.lower]
+        upper = values[:, self.upper]
+
+        return (upper - lower) / self.spans * self.offsets + lower
+
 class ProfileLevels:
 
     def __init__(self, rotorGeometry, windSpeedLevels, windDirectionLevels=None, upflowLevels=None):
@@ -46,6 +91,15 @@ class ProfileLevels:
         else:
             return NoneInterpolator()
 
+    def interpolate(self, dataFrame, levels_dict, heights):
+
+        #returns an array of values (rows x heights) or None if the profile is not defined
+
+        if levels_dict is None:
+            return None
+
+        return ProfileInterpolation(levels_dict, heights)(dataFrame)
+
     def findLowestAbove(self, level):
 
         lowest = None
@@ -200,6 +254,10 @@ class InterpolatedHubWindSpeed(HubParameterBase):
 
         return self.profileLevels.getWindSpeedProfile(row)(self.rotorGeometry.hubHeight)  
 
+    def hubWindSpeeds(self, dataFrame):
+
+        return self.profileLevels.interpolate(dataFrame, self.profileLevels.windSpeedLevels, [self.rotorGeometry.hubHeight])[:, 0]
+
 class PiecewiseHubBase(HubParameterBase):
 
     def __init__(self, profileLevels, rotorGeometry):        
@@ -226,6 +284,23 @@ class PiecewiseExponentHubWindSpeed(PiecewiseHubBase):
 
         return speedBelow * (self.rotorGeometry.hubHeight / self.highestBelow) ** exponent
 
+    def hubWindSpeeds(self, dataFrame):
+
+        speeds = self.profileLevels.interpolate(dataFrame, self.profileLevels.windSpeedLevels, [self.lowestAbove, self.highestBelow])
+
+        speedAbove = speeds[:, 0]
+        speedBelow = speeds[:, 1]
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            ratio = speedAbove / speedBelow
+
+        if (ratio <= 0.0).any():
+            raise Exception("Cannot calculate piecewise exponent from non-positive speed ratio")
+
+        exponent = np.log(ratio) / math.log(self.lowestAbove / self.highestBelow)
+
+        return speedBelow * (self.rotorGeometry.hubHeight / self.highestBelow) ** exponent
+
 class PiecewiseInterpolationHubDirection(PiecewiseHubBase):
 
     def __init__(self, profileLevels, rotorGeometry):        
@@ -247,6 +322,28 @@ class PiecewiseInterpolationHubDirection(PiecewiseHubBase):
 
         return direction
 
+    def bound_directions(self, directions):
+
+        directions = np.where(directions < 0, directions + 360.0 * np.ceil(-directions / 360.0), directions)
+        directions = np.where(directions > 360.0, directions - 360.0 * np.ceil((directions - 360.0) / 360.0), directions)
+
+        return directions
+
+    def hubDirections(self, dataFrame):
+
+        below_directions = self.bound_directions(dataFrame[self.direction_below_col].values.astype(float))
+        above_directions = self.bound_directions(dataFrame[self.direction_above_col].values.astype(float))
+
+        wrapped = np.abs(below_directions - above_directions) > 180.0
+        below_is_larger = below_directions > above_directions
+
+        below_directions = np.where(wrapped & below_is_larger, below_directions - 360.0, below_directions)
+        above_directions = np.where(wrapped & ~below_is_larger, above_directions - 360.0, above_directions)
+
+        slope = (above_directions - below_directions) / (self.x[1] - self.x[0])
+
+        return slope * (self.rotorGeometry.hubHeight - self.x[0]) + below_directions
+
     def hubDirection(self, row):
 
         profile = self.profileLevels.getWindSpeedProfile(row)
@@ -328,6 +425,41 @@ class RotorEquivalentWindSpeed:
 
         return equivalentWindSpeed
         
+    def rewsValues(self, dataFrame):
+
+        heights = [level.level for level in self.rotor.levels]
+
+        speeds = self.profileLevels.interpolate(dataFrame, self.profileLevels.windSpeedLevels, heights)
+        directions = self.profileLevels.interpolate(dataFrame, self.profileLevels.windDirectionLevels, heights)
+        upflows = self.profileLevels.interpolate(dataFrame, self.profileLevels.upflowLevels, heights)
+
+        if not self.hubDirectionCalculator is None:
+            hub_directions = self.hubDirectionCalculator.hubDirections(dataFrame)
+        else:
+            hub_directions = None
+
+        equivalentWindSpeed = 0
+
+        for i, level in enumerate(self.rotor.levels):
+
+            speed = speeds[:, i]
+            direction = None if directions is None else directions[:, i]
+            upflow = None if upflows is None else upflows[:, i]
+
+            level_value = self.level_values(speed, hub_directions, direction, upflow)
+
+            equivalentWindSpeed += level_value ** self.exponent * level.areaFraction
+
+        equivalentWindSpeed = equivalentWindSpeed ** (1.0 / self.exponent)
+
+        return equivalentWindSpeed
+
+    def level_values(self, speed, hub_direction, direction, upflow):
+
+        return speed \
+                         * self.direction_terms(hub_direction, direction) \
+                         * self.upflow_terms(speed, upflow)
+
     def level_value(self, speed, level, hub_direction, direction_profile, upflow_profile):
 
         return speed \
@@ -340,6 +472,25 @@ class RotorEquivalentWindSpeed:
 
         return self.rews(row) / hub_speed
 
+    def rewsToHubRatios(self, dataFrame):
+
+        return self.rewsValues(dataFrame) / self.hubWindSpeedCalculator.hubWindSpeeds(dataFrame)
+
+    def direction_terms(self, hub_direction, direction):
+
+        if not self.rewsVeer or direction is None or hub_direction is None:
+            return 1.0
+        else:
+            return np.cos(self.to_radians(direction) - self.to_radians(hub_direction))
+
+    def upflow_terms(self, speed, upflow):
+
+        if not self.rewsUpflow or upflow is None or self.tilt_rad is None:
+            return 1.0
+        else:
+            upflow_rad = np.arctan2(upflow, speed)
+            return np.cos(upflow_rad + self.tilt_rad) / (np.cos(upflow_rad) * np.cos(self.tilt_rad))
+
     def direction_term(self, level, hub_direction, direction_profile):
 
         if not self.rewsVeer:
@@ -382,5 +533,12 @@ class ProductionByHeight(RotorEquivalentWindSpeed):
 
         return self.power_curve.power(speed)
 
+    def level_values(self, speed, hub_direction, direction, upflow):
+
+        return self.power_curve.power(speed)
+
     def calculate(self, row):
         return self.rews(row)
+
+    def calculateValues(self, dataFrame):
+        return self.rewsValues(dataFrame)
@@ -10,8 +10,10 @@ import zipfile
 from shutil import copyfile
 
 import numpy as np
+import pandas as pd
 
 from analysis import Analysis
+from analysis import hash_file_contents
 
 from ..reporting import data_sharing_reports as reports
 from ..configuration.analysis_configuration import AnalysisConfiguration
@@ -63,14 +65,12 @@ class ShareAnalysis(Analysis):
         #speed optimisation (scatter metric not required for PCWG-Share-X)
         pass
 
-    def load_dataset(self, dataset_config, analysis_config):
+    def configure_dataset(self, dataset_config):
 
         power_filter = Filter(True, dataset_config.power, 'Below', False, 0.0)
 
         dataset_config.filters.append(power_filter)
 
-        return Analysis.load_dataset(self, dataset_config, analysis_config)
-
     def loadData(self, config):
         Analysis.loadData(self, config)
         self.auto_activate_corrections()
@@ -118,7 +118,7 @@ class ShareAnalysis(Analysis):
         lastNormWSbin = 2.95
         normWSstep = 0.1
         self.normalisedWindSpeedBins = binning.Bins(firstNormWSbin, normWSstep, lastNormWSbin)
-        self.dataFrame[self.normalisedWSBin] = (self.dataFrame[self.normalisedWS]).map(self.normalisedWindSpeedBins.binCenter)
+        self.dataFrame[self.normalisedWSBin] = self.normalisedWindSpeedBins.binCenters(self.dataFrame[self.normalisedWS])
 
         if self.hasDirection:
             self.pcwgDirectionBin = 'Wind Direction Bin Centre'
@@ -242,20 +242,22 @@ class ShareAnalysis(Analysis):
                 self.binned_pcwg_err_metrics[dict_key][self.pcwgErrorPdm] = self._calculate_pcwg_error_metric_by_bin(self.pcwgErrorPdm, bin_col_name, pcwg_range = pcwg_range)
             
     def _calculate_pcwg_error_metric_by_bin(self, candidate_error, bin_col_name, pcwg_range = 'All'):
-        def sum_abs(x):
-            return x.abs().sum()
         if pcwg_range == 'All':
-            grouped = self.dataFrame.loc[self.dataFrame[self.pcwgErrorValid], :].groupby(bin_col_name)
+            mask = self.dataFrame[self.pcwgErrorValid]
         elif pcwg_range == 'Inner':
-            grouped = self.dataFrame.loc[np.logical_and(self.dataFrame[self.pcwgErrorValid], (self.dataFrame[self.pcwgRange] == 'Inner')), :].groupby(bin_col_name)
+            mask = np.logical_and(self.dataFrame[self.pcwgErrorValid], (self.dataFrame[self.pcwgRange] == 'Inner'))
         elif pcwg_range == 'Outer':
-            grouped = self.dataFrame.loc[np.logical_and(self.dataFrame[self.pcwgErrorValid], (self.dataFrame[self.pcwgRange] == 'Outer')), :].groupby(bin_col_name)
+            mask = np.logical_and(self.dataFrame[self.pcwgErrorValid], (self.dataFrame[self.pcwgRange] == 'Outer'))
         else:
             raise Exception('Unrecognised pcwg_range argument %s passed to Analysis._calculate_pcwg_error_metric_by_bin() method. Must be Inner, Outer or All.' % pcwg_range)
-        agg = grouped.agg({candidate_error: ['sum', sum_abs, 'count'], self.actualPower: 'sum'})
-        agg.loc[:, (candidate_error, 'NME')] = agg.loc[:, (candidate_error, 'sum')] / agg.loc[:, (self.actualPower, 'sum')]
-        agg.loc[:, (candidate_error, 'NMAE')] = agg.loc[:, (candidate_error, 'sum_abs')] / agg.loc[:, (self.actualPower, 'sum')]
-        return agg.loc[:, candidate_error].drop(['sum', 'sum_abs'], axis = 1).rename(columns = {'count': self.dataCount})
+        #only the columns needed are selected and the absolute error is a column, so all reductions are built-in
+        errors = self.dataFrame.loc[mask, candidate_error]
+        grouped = pd.DataFrame({'sum': errors, 'sum_abs': errors.abs(), 'power': self.dataFrame.loc[mask, self.actualPower]}).groupby(self.dataFrame.loc[mask, bin_col_name])
+        sums = grouped.sum()
+        metrics = pd.DataFrame({self.dataCount: grouped['sum'].count()})
+        metrics['NME'] = sums['sum'] / sums['power']
+        metrics['NMAE'] = sums['sum_abs'] / sums['power']
+        return metrics
     
     def _calculate_pcwg_error_metric(self, candidate_error):
         data_count = len(self.dataFrame.loc[self.dataFrame[self.pcwgErrorValid], candidate_error].dropna())
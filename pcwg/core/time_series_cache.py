@@ -0,0 +1,114 @@
+import os
+import json
+
+import numpy as np
+import pandas as pd
+
+from status import Status
+
+import file_hash
+
+class TimeSeriesCache(object):
+
+    #increment when the cache layout or the way time series are parsed changes
+    Version = 2
+
+    Active = True
+    Extension = ".pcwgcache"
+
+    def __init__(self, path, settings):
+
+        self.path = path
+        self.cache_path = path + TimeSeriesCache.Extension
+        self.settings = settings
+
+    def content_hash(self):
+        return file_hash.file_digests(self.path)[0]
+
+    def key(self, content_hash = True):
+
+        #the cache is only valid for the same file contents, parse settings, code and library versions
+        stat = os.stat(self.path)
+
+        key = {'version': TimeSeriesCache.Version,
+               'size': stat.st_size,
+               'mtime': stat.st_mtime,
+               'contentHash': self.content_hash() if content_hash else None,
+               'settings': sorted(self.settings.items()),
+               'pandas': pd.__version__,
+               'numpy': np.__version__}
+
+        #normalise tuples to lists so keys compare equal after a JSON round trip
+        return json.loads(json.dumps(key))
+
+    def matches(self, key):
+
+        #the contents are only hashed once the size, time stamp and settings match
+        cheap_key = self.key(content_hash = False)
+
+        for name in cheap_key:
+            if name != 'contentHash' and key.get(name) != cheap_key[name]:
+                return False
+
+        return key.get('contentHash') == self.content_hash()
+
+    def load(self):
+
+        if not TimeSeriesCache.Active or not os.path.isfile(self.cache_path):
+            return None
+
+        try:
+
+            #arrays only, so reading a cache file cannot execute code
+            with np.load(self.cache_path, allow_pickle = False) as data:
+
+                header = json.loads(data['header'][()])
+
+                if not self.matches(header['key']):
+                    Status.add("Time series cache is out of date: {0}".format(self.cache_path), verbosity=2)
+                    return None
+
+                index = pd.Index(data['index'], name = header['index'])
+                columns = header['columns']
+
+                dataFrame = pd.DataFrame(dict((column, data['column{0}'.format(i)]) for i, column in enumerate(columns)), index = index, columns = columns)
+
+        except Exception as e:
+            Status.add("Cannot read time series cache {0}: {1}".format(self.cache_path, e), verbosity=2)
+            return None
+
+        Status.add("Loaded time series from cache: {0}".format(self.cache_path), verbosity=2)
+
+        return dataFrame
+
+    def save(self, dataFrame):
+
+        if not TimeSeriesCache.Active:
+            return
+
+        if any(dtype == object for dtype in dataFrame.dtypes):
+            Status.add("Time series contains non-numeric columns and will not be cached: {0}".format(self.path), verbosity=2)
+            return
+
+        header = {'key': self.key(),
+                  'index': dataFrame.index.name,
+                  'columns': list(dataFrame.columns)}
+
+        arrays = dict(('column{0}'.format(i), dataFrame[column].values) for i, column in enumerate(dataFrame.columns))
+        arrays['header'] = np.array(json.dumps(header))
+        arrays['index'] = dataFrame.index.values
+
+        temporary_path = self.cache_path + ".tmp"
+
+        try:
+
+            with open(temporary_path, 'wb') as f:
+                np.savez(f, **arrays)
+
+            if os.path.isfile(self.cache_path):
+                os.remove(self.cache_path)
+
+            os.rename(temporary_path, self.cache_path)
+
+        except (IOError, OSError) as e:
+            Status.add("Cannot write time series cache {0}: {1}".format(self.cache_path, e), verbosity=2)
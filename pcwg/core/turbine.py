@@ -29,6 +29,26 @@ class NoRelaxation:
         
         return correction
 
+class SimulatedPowerFactory:
+
+    def new_simulated_power(self, zero_turbulence_power_curve, integration_range):
+        return SimulatedPower(zero_turbulence_power_curve, integration_range)
+
+class SimulatedPowerLookupFactory:
+
+    def __init__(self, wind_speed_step, turbulence_step, maximum_wind_speed = 30.0, maximum_turbulence = 0.5):
+
+        self.wind_speed_step = wind_speed_step
+        self.turbulence_step = turbulence_step
+        self.maximum_wind_speed = maximum_wind_speed
+        self.maximum_turbulence = maximum_turbulence
+
+    def new_simulated_power(self, zero_turbulence_power_curve, integration_range):
+
+        return SimulatedPowerLookup(SimulatedPower(zero_turbulence_power_curve, integration_range),
+                                    self.wind_speed_step, self.turbulence_step,
+                                    self.maximum_wind_speed, self.maximum_turbulence)
+
 class Relaxation:
     
     def __init__(self, lws_lti, lws_hti, hws_lti, hws_hti, power_function, lower_wind_speed, upper_wind_speed):
@@ -43,16 +63,13 @@ class Relaxation:
 
     def relax(self, correction, wind_speed, reference_turbulence, target_turbulence):
         
-        if target_turbulence > reference_turbulence:
-            if wind_speed > self.inflection_point:
-                return self.hws_hti * correction
-            else:
-                return self.lws_hti * correction
-        else:
-            if wind_speed > self.inflection_point:
-                return self.hws_lti * correction
-            else:
-                return self.lws_lti * correction
+        high_wind_speed = (wind_speed > self.inflection_point)
+
+        factor = np.where(target_turbulence > reference_turbulence,
+                          np.where(high_wind_speed, self.hws_hti, self.lws_hti),
+                          np.where(high_wind_speed, self.hws_lti, self.lws_lti))
+
+        return factor * correction
                 
     def calculate_inflection_point(self, power_function, lower_wind_speed, upper_wind_speed):
 
@@ -89,7 +106,7 @@ class PowerCurve:
     def __init__(self, powerCurveLevels, referenceDensity, rotorGeometry, inputHubWindSpeed = None, actualPower = None,
                 hubTurbulence = None, fixedTurbulence = None, ratedPower = None,
                 name = 'Undefined', interpolationMode = 'Cubic', zero_ti_pc_required = False, xLimits = None, sub_power = None,
-                relaxation_factory = NoRelaxationFactory()):
+                relaxation_factory = NoRelaxationFactory(), simulated_power_factory = SimulatedPowerFactory()):
                 
         self.name = name
         self.interpolationMode = interpolationMode
@@ -135,6 +152,7 @@ class PowerCurve:
 
         self.turbulenceFunction = self.createTurbulenceFunction(wind_data, powerCurveLevels[self.hubTurbulence])
                 
+        self.simulated_power_factory = simulated_power_factory
         self.relaxation = relaxation_factory.new_relaxation(self.powerFunction, self.cutInWindSpeed, self.cutOutWindSpeed)      
         self.ratedPower = self.getRatedPower(ratedPower, powerCurveLevels[self.actualPower])
         
@@ -190,7 +208,7 @@ class PowerCurve:
                                                                  self.availablePower,
                                                                  self.relaxation)
                                                                  
-        self.simulatedPower = SimulatedPower(self.zeroTurbulencePowerCurve, integrationRange)
+        self.simulatedPower = self.simulated_power_factory.new_simulated_power(self.zeroTurbulencePowerCurve, integrationRange)
 
 
     def getRatedPower(self, ratedPower, powerCurveLevels):
@@ -287,9 +305,11 @@ class PowerCurve:
             raise Exception('Unknown interpolation mode: %s' % self.interpolationMode)
 
     def power(self, windSpeed, turbulence = None, extraTurbCorrection = False):
+        
+        #accepts scalars or arrays (e.g. a whole data frame column) and returns the same
         referencePower = self.powerFunction(windSpeed)
             
-        if turbulence == None:
+        if turbulence is None:
             power = referencePower
         else:
             referenceTurbulence = self.referenceTurbulence(windSpeed)
@@ -297,9 +317,10 @@ class PowerCurve:
             power = referencePower + self.relaxation.relax(correction, windSpeed, referenceTurbulence, turbulence)
             if extraTurbCorrection: power *= self.calculateExtraTurbulenceCorrection(windSpeed, turbulence, referenceTurbulence)
 
-        power = max([0.0, power])
-        power = min([self.ratedPower, power])
-        return power
+        power = np.where(power > 0.0, power, 0.0)
+        power = np.where(power < self.ratedPower, power, self.ratedPower)
+
+        return interpolators.scalar_or_array(windSpeed, power)
 
     def calculateExtraTurbulenceCorrection(self, windSpeed, turbulence, referenceTurbulence):
 
@@ -308,22 +329,21 @@ class PowerCurve:
         xprime = saddle - windSpeed
         tprime = (referenceTurbulence - turbulence) / referenceTurbulence
 
-        if xprime < 0.0 or tprime < 0.0: return 1.0
-
-        a = -0.02 * math.tanh(2.0 * tprime)
-        b = -0.03 * (math.exp(1.5 * tprime) - 1.0)
+        a = -0.02 * np.tanh(2.0 * tprime)
+        b = -0.03 * (np.exp(1.5 * tprime) - 1.0)
 
         loss = a * xprime + b
         
-        return 1 + loss
+        return np.where((xprime < 0.0) | (tprime < 0.0), 1.0, 1 + loss)
 
     def referenceTurbulence(self, windSpeed):
-        if windSpeed < self.firstWindSpeed:
-            return self.turbulenceFunction(self.firstWindSpeed)
-        elif windSpeed > self.cutOutWindSpeed:
-            return self.turbulenceFunction(self.cutOutWindSpeed)
-        else:
-            return self.turbulenceFunction(windSpeed)
+
+        windSpeeds = np.asarray(windSpeed, dtype=float)
+
+        windSpeeds = np.where(windSpeeds < self.firstWindSpeed, self.firstWindSpeed, windSpeeds)
+        windSpeeds = np.where(windSpeeds > self.cutOutWindSpeed, self.cutOutWindSpeed, windSpeeds)
+
+        return self.turbulenceFunction(windSpeeds)
             
     def calculateCutInWindSpeed(self, powerCurveLevels):
         return min(self.nonZeroLevels(powerCurveLevels))
@@ -380,21 +400,24 @@ class IntegrationProbabilities:
         self.a = windSpeedStep / math.sqrt(2.0 * math.pi)
                 
     def probabilities(self, windSpeedMean, windSpeedStdDev):
-        if windSpeedStdDev == 0:
+        if np.ndim(windSpeedStdDev) == 0 and windSpeedStdDev == 0:
             return np.nan
 
-        oneOverStandardDeviation = 1.0 / windSpeedStdDev
-        oneOverStandardDeviationSq = oneOverStandardDeviation * oneOverStandardDeviation
-        
-        b = self.a * oneOverStandardDeviation
-        c = -0.5 * oneOverStandardDeviationSq
-        
-        windSpeedMinusMeans = (self.windSpeeds - windSpeedMean)
-        windSpeedMinusMeanSq = windSpeedMinusMeans * windSpeedMinusMeans
+        #column vectors of means/deviations give one row of probabilities per value (zero deviation rows are all NaN)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+
+            oneOverStandardDeviation = 1.0 / windSpeedStdDev
+            oneOverStandardDeviationSq = oneOverStandardDeviation * oneOverStandardDeviation
+            
+            b = self.a * oneOverStandardDeviation
+            c = -0.5 * oneOverStandardDeviationSq
+            
+            windSpeedMinusMeans = (self.windSpeeds - windSpeedMean)
+            windSpeedMinusMeanSq = windSpeedMinusMeans * windSpeedMinusMeans
 
-        d = c * windSpeedMinusMeanSq
+            d = c * windSpeedMinusMeanSq
 
-        return b * np.exp(d)
+            return b * np.exp(d)
                 
 class IntegrationRange:
 
@@ -601,6 +624,8 @@ class IterationPowerCurveStats:
                   
 class SimulatedPower:
 
+    BatchSize = 2000
+    
     def __init__(self, zeroTurbulencePowerCurve, integrationRange):
         
         self.zeroTurbulencePowerCurve = zeroTurbulencePowerCurve
@@ -614,10 +639,106 @@ class SimulatedPower:
         self.integrationPowers = np.array(integrationPowers)
         
     def power(self, windSpeed, turbulence):
+
         standardDeviation = windSpeed * turbulence
-        integrationProbabilities = self.integrationRange.probabilities(windSpeed, standardDeviation)
-        return np.sum(integrationProbabilities * self.integrationPowers) / np.sum(integrationProbabilities)
+
+        if np.ndim(standardDeviation) == 0:
+            integrationProbabilities = self.integrationRange.probabilities(windSpeed, standardDeviation)
+            return np.sum(integrationProbabilities * self.integrationPowers) / np.sum(integrationProbabilities)
+        else:
+            return self.powers(windSpeed, standardDeviation)
+
+    def powers(self, windSpeeds, standardDeviations):
+
+        windSpeeds, standardDeviations = np.broadcast_arrays(np.asarray(windSpeeds, dtype=float), np.asarray(standardDeviations, dtype=float))
+        powers = np.empty(len(windSpeeds))
+
+        #integrate in batches to bound the size of the probability matrix
+        for start in range(0, len(windSpeeds), SimulatedPower.BatchSize):
+
+            end = start + SimulatedPower.BatchSize
+            
+            integrationProbabilities = self.integrationRange.probabilities(windSpeeds[start:end, np.newaxis], standardDeviations[start:end, np.newaxis])
+            
+            with np.errstate(invalid = 'ignore'):
+                powers[start:end] = np.sum(integrationProbabilities * self.integrationPowers, axis=1) / np.sum(integrationProbabilities, axis=1)
+
+        return powers
    
+class SimulatedPowerLookup:
+
+    def __init__(self, simulatedPower, windSpeedStep, turbulenceStep, maximumWindSpeed, maximumTurbulence):
+
+        #grid starts one step above zero (zero standard deviation has no simulated power)
+        self.simulatedPower = simulatedPower
+        self.windSpeedStep = windSpeedStep
+        self.turbulenceStep = turbulenceStep
+        self.windSpeeds = windSpeedStep * np.arange(1, int(round(maximumWindSpeed / windSpeedStep)) + 1)
+        self.turbulences = turbulenceStep * np.arange(1, int(round(maximumTurbulence / turbulenceStep)) + 1)
+
+        if len(self.windSpeeds) < 2 or len(self.turbulences) < 2:
+            raise Exception("Simulated power lookup grid must have at least two wind speeds and two turbulences")
+
+        Status.add("Building {0}x{1} simulated power lookup".format(len(self.windSpeeds), len(self.turbulences)), verbosity=2)
+
+        windSpeedGrid, turbulenceGrid = np.meshgrid(self.windSpeeds, self.turbulences, indexing = 'ij')
+        self.table = self.simulatedPower.power(windSpeedGrid.ravel(), turbulenceGrid.ravel()).reshape(windSpeedGrid.shape)
+
+        self.maximumError = self.calculateMaximumError()
+
+        Status.add("Simulated power lookup maximum interpolation error: {0:.4f} kW ({1:.4f}% of maximum power)".format(self.maximumError, 100.0 * self.maximumError / np.nanmax(self.table)))
+
+    def calculateMaximumError(self):
+
+        #bilinear interpolation error is largest away from the grid nodes, so check against the exact integral at cell centres
+        windSpeedGrid, turbulenceGrid = np.meshgrid(self.windSpeeds[:-1] + 0.5 * self.windSpeedStep,
+                                                    self.turbulences[:-1] + 0.5 * self.turbulenceStep,
+                                                    indexing = 'ij')
+
+        exact = self.simulatedPower.power(windSpeedGrid.ravel(), turbulenceGrid.ravel())
+        interpolated = self.interpolate(windSpeedGrid.ravel(), turbulenceGrid.ravel())
+
+        return np.nanmax(np.abs(interpolated - exact))
+
+    def power(self, windSpeed, turbulence):
+
+        windSpeeds, turbulences = np.broadcast_arrays(np.asarray(windSpeed, dtype=float), np.asarray(turbulence, dtype=float))
+        isScalar = (windSpeeds.ndim == 0)
+        windSpeeds, turbulences = np.atleast_1d(windSpeeds, turbulences)
+
+        inside = (windSpeeds >= self.windSpeeds[0]) & (windSpeeds <= self.windSpeeds[-1]) & \
+                 (turbulences >= self.turbulences[0]) & (turbulences <= self.turbulences[-1])
+
+        powers = np.empty(len(windSpeeds))
+        powers[inside] = self.interpolate(windSpeeds[inside], turbulences[inside])
+
+        #values off the grid (including NaNs) fall back to the exact integral
+        outside = ~inside
+
+        if outside.any():
+            powers[outside] = self.simulatedPower.powers(windSpeeds[outside], windSpeeds[outside] * turbulences[outside])
+
+        if isScalar:
+            return powers[0]
+        else:
+            return powers
+
+    def interpolate(self, windSpeeds, turbulences):
+
+        x = (windSpeeds - self.windSpeeds[0]) / self.windSpeedStep
+        y = (turbulences - self.turbulences[0]) / self.turbulenceStep
+
+        i = np.clip(np.floor(x).astype(int), 0, len(self.windSpeeds) - 2)
+        j = np.clip(np.floor(y).astype(int), 0, len(self.turbulences) - 2)
+
+        fx = x - i
+        fy = y - j
+
+        return self.table[i, j] * (1.0 - fx) * (1.0 - fy) + \
+               self.table[i + 1, j] * fx * (1.0 - fy) + \
+               self.table[i, j + 1] * (1.0 - fx) * fy + \
+               self.table[i + 1, j + 1] * fx * fy
+
 class SimulatedPowerCurve:
 
     def __init__(self, windSpeeds, zeroTurbulencePowerCurve, turbulences, integrationRange):
@@ -78,6 +78,7 @@ class AnalysisConfigurationDialog(base_dialog.BaseConfigurationDialog):
         self.powerDeviationMatrixActive = self.addCheckBox(master, "PDM Correction Active", self.config.powerDeviationMatrixActive)               
         
         self.specifiedPowerDeviationMatrix = self.addFileOpenEntry(master, "Specified PDM:", validation.ValidateSpecifiedPowerDeviationMatrix(master, self.powerDeviationMatrixActive), self.config.specified_power_deviation_matrix.absolute_path, self.filePath)
+        self.power_deviation_matrix_interpolation_mode = self.addOption(master, "PDM Interpolation Mode:", ["Bin", "Multilinear"], self.config.power_deviation_matrix_interpolation_mode)
 
         self.productionByHeightActive = self.addCheckBox(master, "Production By Height Active", self.config.productionByHeightActive)  
 
@@ -119,6 +120,7 @@ class AnalysisConfigurationDialog(base_dialog.BaseConfigurationDialog):
     def add_advanced(self, master):
 
         self.interpolationMode = self.addOption(master, "Interpolation Mode:", ["Linear", "Cubic", "Marmander"], self.config.interpolationMode)
+        self.parallelLoading = self.addCheckBox(master, "Load Datasets In Parallel", self.config.parallelLoading)
 
         self.negative_power_period_treatment = self.addOption(master, "Negative Power Period Treatment", self.config.get_power_treatment_options(), self.config.negative_power_period_treatment)  
         self.negative_power_bin_average_treatment = self.addOption(master, "Negative Power Bin Average Treatment", self.config.get_power_treatment_options(), self.config.negative_power_bin_average_treatment)  
@@ -210,6 +212,7 @@ class AnalysisConfigurationDialog(base_dialog.BaseConfigurationDialog):
         self.config.negative_power_bin_average_treatment = self.negative_power_bin_average_treatment.get()
         
         self.config.interpolationMode = self.interpolationMode.get()
+        self.config.parallelLoading = bool(self.parallelLoading.get())
         self.config.powerCurveMode = self.powerCurveMode.get()
         self.config.powerCurvePaddingMode = self.powerCurvePaddingMode.get()
         self.config.nominal_wind_speed_distribution.absolute_path = self.nominalWindSpeedDistribution.get()
@@ -234,6 +237,7 @@ class AnalysisConfigurationDialog(base_dialog.BaseConfigurationDialog):
 
         self.config.specified_power_deviation_matrix.absolute_path = self.specifiedPowerDeviationMatrix.get()
         self.config.powerDeviationMatrixActive = bool(self.powerDeviationMatrixActive.get())
+        self.config.power_deviation_matrix_interpolation_mode = self.power_deviation_matrix_interpolation_mode.get()
         
         self.dataset_grid_box.datasets_file_manager.set_base(self.config.path)
         self.config.datasets = self.dataset_grid_box.datasets_file_manager
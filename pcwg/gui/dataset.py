@@ -30,6 +30,7 @@ from ..configuration.preferences_configuration import Preferences
 
 from ..core.dataset import getSeparatorValue
 from ..core.dataset import getDecimalValue
+from ..core.dataset import readColumnHeader
 
 from ..exceptions.handling import ExceptionHandler
 from ..core.status import Status
@@ -470,6 +471,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
         self.dateFormat = self.addEntry(master, "Date Format:", validation.ValidateNotBlank(master), self.config.dateFormat, width = 60)
         pickDateFormatButton = tk.Button(master, text=".", command = base_dialog.DateFormatPicker(self, self.dateFormat, ['%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%d-%m-%y %H:%M', '%y-%m-%d %H:%M', '%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%y %H:%M', '%y/%m/%d %H:%M']), width=5, height=1)
         pickDateFormatButton.grid(row=(self.row-1), sticky=tk.E+tk.N, column=self.buttonColumn)              
+        self.timeStampAtEndOfPeriod = self.addCheckBox(master, "Time Stamp At End Of Period:", self.config.timeStampAtEndOfPeriod)
 
         self.timeStamp = self.addPickerEntry(master, "Time Stamp:", validation.ValidateNotBlank(master), self.config.timeStamp, width = 60) 
         self.turbineLocationWindSpeed = self.addPickerEntry(master, "Turbine Location Wind Speed:", None, self.config.turbineLocationWindSpeed, width = 60) #Should this be with reference wind speed?
@@ -477,6 +479,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
         self.hubTurbulence = self.addPickerEntry(master, "Hub Turbulence:", None, self.config.hubTurbulence, width = 60)
         self.temperature = self.addPickerEntry(master, "Temperature:", None, self.config.temperature, width = 60)
         self.pressure = self.addPickerEntry(master, "Pressure:", None, self.config.pressure, width = 60)
+        self.humidity = self.addPickerEntry(master, "Relative Humidity (%):", None, self.config.humidity, width = 60)
         self.density = self.addPickerEntry(master, "Density:", None, self.config.density, width = 60)
         self.inflowAngle = self.addPickerEntry(master, "Inflow Angle:", None, self.config.inflowAngle, width = 60)
         self.inflowAngle.setTip('Not required')
@@ -622,6 +625,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
 
         self.availableColumnsFile = None
         self.columnsFileHeaderRows = None
+        self.columnsFileFormat = None
         self.availableColumns = []
 
         self.shearWindSpeedHeights = []
@@ -685,16 +689,19 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
             densityModeSpecifiedComment = "Not required when density mode is set to specified"
             self.temperature.setTip(densityModeSpecifiedComment)
             self.pressure.setTip(densityModeSpecifiedComment)
+            self.humidity.setTip(densityModeSpecifiedComment)
             self.density.clearTip()
         elif self.densityMode.get() == "Calculated":
             densityModeCalculatedComment = "Not required when density mode is set to calculate"
             self.temperature.clearTip()
             self.pressure.clearTip()
+            self.humidity.setTip("Optional (dry air is assumed if not specified)")
             self.density.setTip(densityModeCalculatedComment)
         elif self.densityMode.get() == "None":
             densityModeNoneComment = "Not required when density mode is set to none"
             self.temperature.setTip(densityModeNoneComment)
             self.pressure.setTip(densityModeNoneComment)
+            self.humidity.setTip(densityModeNoneComment)
             self.density.setTip(densityModeNoneComment)
         else:
             raise Exception("Unknown density methods: %s" % self.densityMode.get())
@@ -823,7 +830,9 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
         inputTimeSeriesPath = self.config.input_time_series.absolute_path
         headerRows = self.getHeaderRows()
                         
-        if self.columnsFileHeaderRows != headerRows or self.availableColumnsFile != inputTimeSeriesPath:
+        fileFormat = (self.separator.get(), self.decimal.get())
+
+        if self.columnsFileHeaderRows != headerRows or self.availableColumnsFile != inputTimeSeriesPath or self.columnsFileFormat != fileFormat:
 
                                         
             try:
@@ -838,6 +847,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
 
             self.columnsFileHeaderRows = headerRows
             self.availableColumnsFile = inputTimeSeriesPath
+            self.columnsFileFormat = fileFormat
 
         try:                                
             base_dialog.ColumnPickerDialog(parentDialog, pick, self.availableColumns, selectedColumn)
@@ -848,10 +858,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
          Status.add('reading dataSet', verbosity=2)
          inputTimeSeriesPath = self.config.input_time_series.absolute_path
          headerRows = self.getHeaderRows()    
-         dataFrame = pd.read_csv(inputTimeSeriesPath, sep = getSeparatorValue(self.separator.get()), skiprows = headerRows, decimal = getDecimalValue(self.decimal.get()))               
-         self.availableColumns = []
-         for col in dataFrame:
-            self.availableColumns.append(col)
+         self.availableColumns = readColumnHeader(inputTimeSeriesPath, self.separator.get(), self.decimal.get(), headerRows)
                     
     def setConfigValues(self):
 
@@ -866,6 +873,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
         self.config.timeStepInSeconds = int(self.timeStepInSeconds.get())
         self.config.badData = float(self.badData.get())
         self.config.dateFormat = self.dateFormat.get()
+        self.config.timeStampAtEndOfPeriod = bool(self.timeStampAtEndOfPeriod.get())
         self.config.separator = self.separator.get()
         self.config.decimal = self.decimal.get()
         self.config.headerRows = self.getHeaderRows()
@@ -884,6 +892,7 @@ class DatasetConfigurationDialog(base_dialog.BaseConfigurationDialog):
         
         self.config.temperature = self.temperature.get()
         self.config.pressure = self.pressure.get()
+        self.config.humidity = self.humidity.get()
         self.config.density = self.density.get()
         
         self.config.hubWindSpeed = self.hubWindSpeed.get()
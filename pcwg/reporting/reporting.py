@@ -508,6 +508,11 @@ class Report:
             sh.write(row, dataColumn, datasetConfig.pressure)
             row += 1
 
+            if datasetConfig.calculateDensity and datasetConfig.humidity:
+                sh.write(row, labelColumn, "Humidity", self.bold_style)
+                sh.write(row, dataColumn, datasetConfig.humidity)
+                row += 1
+
             if len(datasetConfig.turbineShearMeasurements) > 0:
                 row = self.writeShear(sh,labelColumn,dataColumn,row,datasetConfig.referenceShearMeasurements,'Reference Location ')
                 row = self.writeShear(sh,labelColumn,dataColumn,row,datasetConfig.turbineShearMeasurements,'Turbine Location ')
@@ -546,6 +551,8 @@ class Report:
             sh.write(row, dataColumn + 1, "Inclusive", self.bold_style)
             sh.write(row, dataColumn + 2, "Filter Value", self.bold_style)
             sh.write(row, dataColumn + 3, "Active", self.bold_style)
+            sh.write(row, dataColumn + 4, "Removed (Alone)", self.bold_style)
+            sh.write(row, dataColumn + 5, "Removed (Incremental)", self.bold_style)
             row += 1
 
             for filter in datasetConfig.filters:
@@ -562,6 +569,10 @@ class Report:
                     sh.write(row, dataColumn + 2, str(filter))
                     sh.write(row, dataColumn + 3, "True") # always true if in list...
 
+                if filter.removedAlone is not None:
+                    sh.write(row, dataColumn + 4, filter.removedAlone)
+                    sh.write(row, dataColumn + 5, filter.removedIncrementally)
+
                 row += 1
 
     def writeShear(self,sh,labelColumn,dataColumn,row,shearList,prefix=""):
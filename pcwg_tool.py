@@ -1,7 +1,10 @@
+import multiprocessing
+
 import pcwg.configuration.preferences_configuration as pref
 import pcwg.gui.root as gui
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     preferences = pref.Preferences.get()
     user_interface = gui.UserInterface(preferences)
     preferences.save()
@@ -0,0 +1,230 @@
+from pcwg.core.analysis import MeasuredPowerCurveStatistics
+from pcwg.core.analysis import PadderFactory
+from pcwg.core.analysis import SubPower
+from pcwg.core.analysis import Analysis
+from pcwg.core.time_series_cache import TimeSeriesCache
+from pcwg.core.binning import Bins
+from pcwg.core.binning import Aggregations
+from pcwg.configuration.analysis_configuration import AnalysisConfiguration
+from pcwg.configuration.base_configuration import Filter
+from nose.plugins.attrib import attr
+from os.path import abspath, join, dirname
+import numpy as np
+import pandas as pd
+import unittest
+import multiprocessing
+
+PACKAGE_ROOT = abspath(join(dirname(__file__), '..'))
+
+
+class TestMeasuredPowerCurveStatistics(unittest.TestCase):
+
+    def setUp(self):
+
+        random = np.random.RandomState(0)
+        rows = 5000
+
+        self.dataFrame = pd.DataFrame({'Bin': np.round(random.uniform(0.0, 20.0, rows)),
+                                       'Power': random.uniform(-50.0, 2000.0, rows),
+                                       'Speed': random.uniform(0.0, 20.0, rows),
+                                       'Cp': random.uniform(0.0, 0.5, rows)})
+
+        self.dataFrame.loc[::17, 'Bin'] = np.nan
+        self.dataFrame.loc[::5, 'Cp'] = np.nan
+
+        hours = random.randint(0, 24, rows)
+
+        base = random.uniform(size = rows) < 0.9
+
+        self.masks = {'All': base,
+                      'Day': base & (hours >= 7) & (hours <= 20),
+                      'Night': base & ((hours < 7) | (hours > 20)),
+                      'Sparse': base & (random.uniform(size = rows) < 0.01)}
+
+        self.statistics = MeasuredPowerCurveStatistics(self.dataFrame, 'Bin', self.masks, ['Power', 'Speed', 'Cp'], 'Power')
+
+    def test_matches_groupby(self):
+
+        for name in self.masks:
+
+            filtered = self.dataFrame[self.masks[name]]
+            grouped = filtered.groupby('Bin')
+
+            populated = self.statistics.populated(name)
+
+            np.testing.assert_array_equal(self.statistics.bin_centers[populated], grouped.size().index.values)
+            np.testing.assert_array_equal(self.statistics.count(name, 'Cp')[populated], grouped['Cp'].count().values)
+
+            for column in ['Power', 'Speed', 'Cp']:
+                np.testing.assert_allclose(self.statistics.average(name, column)[populated], grouped[column].mean().values, rtol = 1e-12)
+
+            np.testing.assert_allclose(self.statistics.stddev(name)[populated], grouped['Power'].std().values, rtol = 1e-10)
+
+    def test_minimum_count(self):
+
+        counts = self.statistics.count('Sparse', 'Power')
+        means = self.statistics.average('Sparse', 'Power', minimum_count = 2)
+
+        self.assertTrue(np.isnan(means[counts < 2]).all())
+        self.assertFalse(np.isnan(means[counts >= 2]).any())
+        self.assertTrue(np.isnan(self.statistics.stddev('Sparse')[counts < 2]).all())
+
+    def test_empty_column(self):
+
+        self.dataFrame['Cp'] = np.nan
+        self.dataFrame['Power'] = np.nan
+
+        statistics = MeasuredPowerCurveStatistics(self.dataFrame, 'Bin', self.masks, ['Power', 'Cp'], 'Power')
+
+        self.assertTrue(np.isnan(statistics.average('All', 'Cp')).all())
+        self.assertTrue(np.isnan(statistics.stddev('All')).all())
+
+class TestPadder(unittest.TestCase):
+
+    def setUp(self):
+
+        centers = [3.0, 4.0, 6.0, 7.0]
+
+        self.levels = pd.DataFrame({'Power': [50.0, 200.0, 900.0, 800.0],
+                                    'Speed': centers,
+                                    'Turbulence': [0.2, 0.15, 0.1, 0.08],
+                                    'Count': [10, 20, 30, 40]}, index = pd.Index(centers, name = 'Bin'), columns = ['Power', 'Speed', 'Turbulence', 'Count'])
+
+        self.bins = Bins(1.0, 1.0, 10.0)
+
+    def pad(self, mode):
+        return PadderFactory.generate(mode, 'Power', 'Speed', 'Turbulence', 'Count').pad(self.levels.copy(), 2.0, 9.0, 1000.0, self.bins)
+
+    def test_padding(self):
+
+        padded = self.pad('max')
+
+        np.testing.assert_array_equal(padded.index.values, [1.0, 2.0, 3.0, 4.0, 6.0, 7.0, 8.0, 9.0, 10.0])
+        np.testing.assert_array_equal(padded['Power'].values, [0.0, 900.0, 50.0, 200.0, 900.0, 800.0, 900.0, 900.0, 0.0])
+        np.testing.assert_array_equal(padded['Turbulence'].values, [0.2, 0.2, 0.2, 0.15, 0.1, 0.08, 0.08, 0.08, 0.08])
+        np.testing.assert_array_equal(padded['Count'].values, [0, 0, 10, 20, 30, 40, 0, 0, 0])
+        self.assertEqual(padded.index.name, 'Bin')
+
+        self.assertEqual(self.pad('last observed').loc[8.0, 'Power'], 800.0)
+        self.assertEqual(self.pad('rated').loc[8.0, 'Power'], 1000.0)
+
+        pd.util.testing.assert_frame_equal(self.pad('none'), self.levels)
+
+class TestSubPower(unittest.TestCase):
+
+    def test_shared_statistics(self):
+
+        random = np.random.RandomState(0)
+        rows = 2000
+
+        dataFrame = pd.DataFrame({'Speed': random.uniform(0.0, 20.0, rows), 'Power': random.uniform(-10.0, 2000.0, rows)})
+        dataFrame.loc[::11, 'Speed'] = np.nan
+        dataFrame.loc[dataFrame['Speed'] < 3.0, 'Power'] = 0.0
+
+        bins = Bins(1.0, 1.0, 20.0)
+        cache = {}
+
+        first = SubPower(dataFrame, (random.uniform(size = rows) < 0.5), Aggregations(), 'Speed', 'Power', bins, cache = cache)
+
+        mask = random.uniform(size = rows) < 0.2
+        second = SubPower(dataFrame, mask, Aggregations(), 'Speed', 'Power', bins, cache = cache)
+
+        self.assertIs(first.unfiltered_sub_power, second.unfiltered_sub_power)
+        self.assertEqual(second.cut_in_wind_speed, 3.0)
+
+        filtered = dataFrame[mask]
+        centers = second.wind_speed_sub_bins.binCenters(filtered['Speed'])
+
+        np.testing.assert_array_equal(second.filtered_sub_power['Data Count'].values, filtered['Power'].groupby(centers).count().values)
+        np.testing.assert_allclose(second.filtered_sub_power['Power'].values, filtered['Power'].groupby(centers).mean().values, rtol = 1e-12)
+        np.testing.assert_array_equal(dataFrame['Wind Speed Sub Bin'].values, second.wind_speed_sub_bins.binCenters(dataFrame['Speed']))
+
+    def test_matches_uncached(self):
+
+        random = np.random.RandomState(1)
+        rows = 2000
+
+        dataFrame = pd.DataFrame({'Speed': random.uniform(0.0, 20.0, rows),
+                                  'Power': random.uniform(-10.0, 2000.0, rows),
+                                  'Other Power': random.uniform(-10.0, 1500.0, rows)})
+
+        dataFrame.loc[::13, 'Speed'] = np.nan
+
+        filtered = dataFrame[dataFrame['Power'] > 100.0].copy()
+
+        cases = [(dataFrame, random.uniform(size = rows) < 0.5, 'Power', Bins(1.0, 1.0, 20.0)),
+                 (dataFrame, random.uniform(size = rows) < 0.3, 'Other Power', Bins(1.0, 1.0, 20.0)),
+                 (filtered, random.uniform(size = len(filtered)) < 0.5, 'Power', Bins(1.0, 1.0, 20.0)),
+                 (dataFrame, random.uniform(size = rows) < 0.5, 'Power', Bins(0.5, 0.5, 20.0))]
+
+        cache = {}
+
+        for frame, mask, power, bins in cases:
+
+            cached = SubPower(frame, mask, Aggregations(), 'Speed', power, bins, cache = cache)
+            expected = SubPower(frame.copy(), mask, Aggregations(), 'Speed', power, bins)
+
+            pd.util.testing.assert_frame_equal(cached.unfiltered_sub_power, expected.unfiltered_sub_power)
+            pd.util.testing.assert_frame_equal(cached.filtered_sub_power, expected.filtered_sub_power)
+            self.assertEqual(cached.cut_in_wind_speed, expected.cut_in_wind_speed)
+
+            np.testing.assert_array_equal(frame['Wind Speed Sub Bin'].values, cached.wind_speed_sub_bins.binCenters(frame['Speed']))
+
+class FilteredAnalysis(Analysis):
+
+    def configure_dataset(self, dataset_config):
+        dataset_config.filters.append(Filter(True, dataset_config.hubWindSpeed, 'Below', False, 4.0))
+
+class LoggedAnalysis(FilteredAnalysis):
+
+    def load_dataset(self, dataset_config, analysis_config):
+        self.loaded = getattr(self, 'loaded', []) + [dataset_config.name]
+        return FilteredAnalysis.load_dataset(self, dataset_config, analysis_config)
+
+class TestParallelLoading(unittest.TestCase):
+
+    def setUp(self):
+
+        self.cpu_count = multiprocessing.cpu_count
+        multiprocessing.cpu_count = lambda: 4
+
+        TimeSeriesCache.Active = False
+
+    def tearDown(self):
+
+        multiprocessing.cpu_count = self.cpu_count
+        TimeSeriesCache.Active = True
+
+    def analysis(self, analysis_type, parallel):
+
+        config = AnalysisConfiguration(join(PACKAGE_ROOT, 'Data', 'Dataset 1 Analysis.xml'))
+        config.datasets.append_relative('Dataset 2 config.xml')
+        config.parallelLoading = parallel
+
+        return analysis_type(config)
+
+    @attr('slow')
+    def test_matches_serial(self):
+
+        serial = self.analysis(FilteredAnalysis, False)
+        parallel = self.analysis(FilteredAnalysis, True)
+
+        pd.util.testing.assert_frame_equal(parallel.dataFrame, serial.dataFrame)
+
+        self.assertEqual([config.name for config in parallel.datasetConfigs], ['Dataset 1', 'Dataset 2'])
+
+        for serial_config, parallel_config in zip(serial.datasetConfigs, parallel.datasetConfigs):
+            self.assertIs(parallel_config.data.config, parallel_config)
+            self.assertEqual([(f.applied, f.removedAlone) for f in parallel_config.filters], [(f.applied, f.removedAlone) for f in serial_config.filters])
+            self.assertGreater(parallel_config.filters[-1].removedAlone, 0)
+
+    @attr('slow')
+    def test_load_dataset_override(self):
+
+        #workers cannot call an overridden load_dataset, so these analyses are loaded serially
+        analysis = self.analysis(LoggedAnalysis, True)
+
+        self.assertEqual(analysis.loaded, ['Dataset 1', 'Dataset 2'])
+
+if __name__ == '__main__':
+    unittest.main()
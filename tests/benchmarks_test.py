@@ -5,9 +5,17 @@ from nose.plugins.attrib import attr
 from pcwg.configuration.analysis_configuration import AnalysisConfiguration
 from pcwg.configuration.benchmark_configuration import BenchmarkConfiguration
 from pcwg.core.benchmark import BenchmarkAnalysis
+from pcwg.core.time_series_cache import TimeSeriesCache
 
 PACKAGE_ROOT = abspath(join(dirname(__file__), '..'))
 
+#benchmarks always parse the raw data and leave no cache files next to it
+def setup_module():
+    TimeSeriesCache.Active = False
+
+def teardown_module():
+    TimeSeriesCache.Active = True
+
 @attr('slow')
 def test_benchmark():
     path = join(PACKAGE_ROOT, 'Data', 'Benchmark.xml')
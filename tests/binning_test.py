@@ -0,0 +1,66 @@
+from pcwg.core.binning import Bins
+from pcwg.core.binning import Aggregations
+import numpy as np
+import pandas as pd
+import unittest
+
+
+class TestBins(unittest.TestCase):
+
+    def assert_matches_scalar(self, bins, values):
+
+        expected = np.array([bins.binCenter(value) for value in values])
+        actual = bins.binCenters(values)
+
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_random_values(self):
+
+        bins = Bins(0.01, 0.02, None, 25)
+        random = np.random.RandomState(0)
+
+        self.assert_matches_scalar(bins, random.uniform(-0.1, 0.6, 1000))
+        self.assert_matches_scalar(bins, np.round(random.uniform(-0.1, 0.6, 1000), 2))
+
+    def test_bin_edges(self):
+
+        bins = Bins(1.0, 1.0, 30.0)
+
+        starts = [limit[0] for limit in bins.limits]
+        ends = [limit[1] for limit in bins.limits]
+
+        self.assert_matches_scalar(bins, starts + ends + bins.centers + [-3.5, -0.5, 0.5, 2.5, 45.5])
+
+    def test_nan(self):
+
+        bins = Bins(0.0, 0.5, None, 40)
+
+        centers = bins.binCenters([np.nan, 1.0])
+
+        self.assertTrue(np.isnan(centers[0]))
+        self.assertEqual(centers[1], 1.0)
+
+class TestAggregations(unittest.TestCase):
+
+    def test_matches_callables(self):
+
+        random = np.random.RandomState(0)
+        rows = 500
+
+        dataFrame = pd.DataFrame({'Bin': random.randint(0, 40, rows), 'Power': random.uniform(0.0, 2000.0, rows)})
+        dataFrame.loc[::3, 'Power'] = np.nan
+
+        aggregations = Aggregations(minimumCount = 5)
+        grouped = dataFrame['Power'].groupby(dataFrame['Bin'])
+
+        for aggregation in ['average', 'stddev', 'count', 'minimum', 'standardError']:
+
+            expected = grouped.aggregate(getattr(aggregations, aggregation))
+            actual = aggregations.aggregate(grouped, aggregation)
+
+            np.testing.assert_allclose(actual.values, expected.values, rtol = 1e-12)
+
+        self.assertTrue(np.isnan(aggregations.aggregate(grouped, 'average')[grouped.count() < 5]).all())
+
+if __name__ == '__main__':
+    unittest.main()
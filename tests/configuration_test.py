@@ -1,6 +1,7 @@
 import unittest
 import tempfile
 import os
+import numpy as np
 
 from pcwg import configuration
 
@@ -43,5 +44,54 @@ class TestPortfolioConfiguration(unittest.TestCase):
         
         os.remove(f.name)
 
+class TestPowerDeviationMatrixConfiguration(unittest.TestCase):
+
+    def setUp(self):
+
+        f = tempfile.NamedTemporaryFile(delete=False)
+
+        cells = ""
+
+        for speed, turbulence, value in [(1.0, 0.1, 0.01), (1.0, 0.2, 0.02), (2.0, 0.1, 0.03)]:
+            cells += "<Cell><CellDimensions> \
+                        <CellDimension><Parameter>NormalisedWindSpeed</Parameter><BinCenter>{0}</BinCenter></CellDimension> \
+                        <CellDimension><Parameter>Turbulence</Parameter><BinCenter>{1}</BinCenter></CellDimension> \
+                      </CellDimensions><Value>{2}</Value></Cell>".format(speed, turbulence, value)
+
+        f.write("<PowerDeviationMatrix xmlns=\"http://www.pcwg.org\"> \
+                    <Name>Test</Name> \
+                    <OutOfRangeValue>-1</OutOfRangeValue> \
+                    <Dimensions> \
+                        <Dimension><Parameter>Turbulence</Parameter><CenterOfFirstBin>0.1</CenterOfFirstBin><BinWidth>0.1</BinWidth><NumberOfBins>2</NumberOfBins></Dimension> \
+                        <Dimension><Parameter>NormalisedWindSpeed</Parameter><CenterOfFirstBin>1.0</CenterOfFirstBin><BinWidth>1.0</BinWidth><NumberOfBins>2</NumberOfBins></Dimension> \
+                    </Dimensions> \
+                    <Cells>{0}</Cells> \
+                </PowerDeviationMatrix>".format(cells))
+
+        f.close()
+
+        self.matrix = configuration.PowerDeviationMatrixConfiguration(f.name)
+
+        os.remove(f.name)
+
+    def test_bin_lookup(self):
+
+        deviations = self.matrix.deviations({'Turbulence': np.array([0.12, 0.24, 0.08, 0.4]),
+                                             'NormalisedWindSpeed': np.array([1.3, 0.6, 2.2, 1.0])})
+
+        np.testing.assert_array_equal(deviations, [0.01, 0.02, 0.03, -1.0])
+        self.assertEqual(self.matrix[{'Turbulence': 0.2, 'NormalisedWindSpeed': 1.0}], 0.02)
+
+    def test_missing_cell(self):
+
+        self.assertRaises(Exception, self.matrix.deviations, {'Turbulence': np.array([0.1, 0.2]), 'NormalisedWindSpeed': np.array([1.0, 2.0])})
+
+    def test_multilinear_lookup(self):
+
+        deviations = self.matrix.deviations({'Turbulence': np.array([0.1, 0.1, 0.15, 0.06]),
+                                             'NormalisedWindSpeed': np.array([1.0, 1.25, 1.0, 0.9])}, interpolate=True)
+
+        np.testing.assert_allclose(deviations, [0.01, 0.015, 0.015, 0.01])
+
 if __name__ == '__main__':
     unittest.main()
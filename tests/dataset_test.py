@@ -0,0 +1,389 @@
+from pcwg.core.dataset import ShearExponentCalculator
+from pcwg.core.dataset import SiteCalibrationCalculator
+from pcwg.core.dataset import Dataset
+from pcwg.core.dataset import parseTimeStamps
+from pcwg.core.dataset import mergeIntervals
+from pcwg.core.dataset import airDensity
+from pcwg.core.time_series_cache import TimeSeriesCache
+from pcwg.configuration.dataset_configuration import ShearMeasurement
+from pcwg.configuration.dataset_configuration import DatasetConfiguration
+from pcwg.configuration.dataset_configuration import Exclusion
+from pcwg.configuration.analysis_configuration import AnalysisConfiguration
+from pcwg.configuration.base_configuration import Filter
+from pcwg.configuration.base_configuration import RelationshipFilter
+from pcwg.configuration.base_configuration import TimeOfDayFilter
+from os.path import abspath, join, dirname
+import numpy as np
+import pandas as pd
+import unittest
+import tempfile
+import shutil
+import datetime
+
+PACKAGE_ROOT = abspath(join(dirname(__file__), '..'))
+
+fixture = {}
+
+def setUpModule():
+
+    #a ten minute time series with a four sector least squares site calibration, loaded as a Dataset
+    fixture['directory'] = tempfile.mkdtemp()
+
+    random = np.random.RandomState(0)
+    rows = 1500
+
+    data = pd.DataFrame({'Time Stamp': pd.date_range('2016-01-01 00:10', periods = rows, freq = '10min').strftime('%d/%m/%Y %H:%M'),
+                         'Reference Speed': random.uniform(3.0, 15.0, rows),
+                         'Reference Direction': random.uniform(0.0, 360.0, rows)},
+                        columns = ['Time Stamp', 'Reference Speed', 'Reference Direction'])
+
+    data['Turbine Speed'] = data['Reference Speed'] * (1.0 + data['Reference Direction'] / 3600.0) + random.normal(0.0, 0.2, rows)
+    data['Reference Speed SD'] = data['Reference Speed'] * random.uniform(0.05, 0.15, rows)
+    data['Density'] = random.uniform(1.15, 1.25, rows)
+    data['Power'] = random.uniform(0.0, 2000.0, rows)
+    data.loc[::37, 'Turbine Speed'] = -99.99
+
+    path = join(fixture['directory'], 'Calibrated.dat')
+    data.to_csv(path, sep = '\t', index = False)
+
+    config = DatasetConfiguration()
+    config.name = 'Calibrated'
+    config.input_time_series.absolute_path = path
+    config.timeStamp = 'Time Stamp'
+    config.dateFormat = '%d/%m/%Y %H:%M'
+    config.hubWindSpeedMode = 'Calculated'
+    config.calculateHubWindSpeed = True
+    config.calibrationMethod = 'LeastSquares'
+    config.siteCalibrationNumberOfSectors = 4
+    config.referenceWindSpeed = 'Reference Speed'
+    config.referenceWindDirection = 'Reference Direction'
+    config.turbineLocationWindSpeed = 'Turbine Speed'
+    config.referenceWindSpeedStdDev = 'Reference Speed SD'
+    config.density = 'Density'
+    config.power = 'Power'
+    config.diameter = 90.0
+    config.hubHeight = 80.0
+
+    #as read from a configuration file without these settings
+    config.powerMin = config.powerMax = config.powerSD = None
+    config.sensitivityDataColumns = []
+
+    TimeSeriesCache.Active = False
+
+    fixture['config'] = config
+    fixture['dataset'] = Dataset(config, AnalysisConfiguration())
+
+def tearDownModule():
+
+    TimeSeriesCache.Active = True
+    shutil.rmtree(fixture['directory'])
+
+
+
+class TestShearExponentCalculator(unittest.TestCase):
+
+    def setUp(self):
+
+        heights = [40.0, 60.0, 80.0, 100.0]
+
+        self.calculator = ShearExponentCalculator([ShearMeasurement(height, "Speed {0}".format(height)) for height in heights])
+
+        random = np.random.RandomState(0)
+        rows = 200
+
+        data = {}
+
+        for height in heights:
+            data["Speed {0}".format(height)] = random.uniform(4.0, 12.0, rows) * (height / 80.0) ** random.uniform(0.0, 0.4, rows)
+
+        self.dataFrame = pd.DataFrame(data)
+        self.dataFrame.iloc[::5, 0] = np.nan
+        self.dataFrame.iloc[::7, 2] = np.nan
+
+    def test_matches_row_wise(self):
+
+        expected = self.dataFrame.apply(self.calculator.shearExponent, axis=1)
+        actual = self.calculator.shearExponents(self.dataFrame)
+
+        np.testing.assert_allclose(actual.values, expected.values, rtol = 1e-10)
+
+    def test_insufficient_levels(self):
+
+        self.dataFrame.iloc[0, 1:] = np.nan
+        self.dataFrame.iloc[1, :] = np.nan
+
+        shear = self.calculator.shearExponents(self.dataFrame)
+
+        self.assertTrue(np.isnan(shear.iloc[0]))
+        self.assertTrue(np.isnan(shear.iloc[1]))
+        self.assertFalse(np.isnan(shear.iloc[2]))
+
+    def test_equal_speeds(self):
+
+        self.dataFrame.iloc[0, :] = 8.0
+
+        self.assertEqual(self.calculator.shearExponents(self.dataFrame).iloc[0], 0.0)
+
+class TestSiteCalibrationCalculator(unittest.TestCase):
+
+    def test_matches_row_wise(self):
+
+        sectors = pd.DataFrame({'Slope': [1.1, 0.9, 1.0], 'Offset': [0.2, -0.1, 0.0]}, index = [0.0, 120.0, 240.0])
+        calculator = SiteCalibrationCalculator('Direction Bin', 'Speed', sectors, actives = {0.0: True, 120.0: True, 240.0: False})
+
+        random = np.random.RandomState(0)
+        rows = 100
+
+        dataFrame = pd.DataFrame({'Direction Bin': random.choice([0.0, 120.0, 240.0, 300.0, np.nan], rows),
+                                  'Speed': random.uniform(3.0, 15.0, rows)})
+
+        dataFrame.loc[::9, 'Speed'] = np.nan
+
+        expected = dataFrame.apply(calculator.turbineValue, axis=1)
+        actual = calculator.turbineValues(dataFrame)
+
+        pd.util.testing.assert_series_equal(actual, expected)
+
+class TestConvergenceCheck(unittest.TestCase):
+
+    def test_matches_expanding_mean(self):
+
+        dataset = fixture['dataset']
+        dataFrame = dataset.filteredCalibrationDataframe
+
+        for direction in [0, 90, 180, 270]:
+
+            sector = dataFrame[dataFrame[dataset.referenceDirectionBin] == direction]
+            ratios = (sector[dataset.turbineLocationWindSpeed] / sector[dataset.referenceWindSpeed]).dropna()
+            expected = ratios.expanding().mean().values / ratios.mean()
+
+            np.testing.assert_allclose(dataset.calibrationSectorConverge[direction].dropna().values, expected, rtol = 1e-12)
+
+        summary = dataset.calibrationSectorConvergeSummary
+
+        self.assertEqual(summary.loc[90, 'rolling_mean_vRatio_16hrs'], dataset.calibrationSectorConverge.loc[96, 90])
+
+class TestSiteCalibration(unittest.TestCase):
+
+    def test_least_squares_sectors(self):
+
+        dataset = fixture['dataset']
+        config = fixture['config']
+
+        sectors = dataset.calibrationCalculator.calibrationSectorDataframe
+        dataFrame = dataset.filteredCalibrationDataframe[[config.referenceWindSpeed, config.turbineLocationWindSpeed, dataset.referenceDirectionBin]].dropna()
+
+        self.assertEqual(sorted(sectors.index), [0.0, 90.0, 180.0, 270.0])
+
+        for direction, sector in dataFrame.groupby(dataset.referenceDirectionBin):
+
+            reference = sector[config.referenceWindSpeed]
+            turbine = sector[config.turbineLocationWindSpeed]
+
+            slope, offset = np.polyfit(reference, turbine, 1)
+
+            self.assertAlmostEqual(sectors.loc[direction, 'Slope'], slope, places=10)
+            self.assertAlmostEqual(sectors.loc[direction, 'Offset'], offset, places=10)
+            self.assertAlmostEqual(sectors.loc[direction, 'Corr'], np.corrcoef(reference, turbine)[0, 1], places=10)
+            self.assertEqual(sectors.loc[direction, 'Count'], len(sector))
+            self.assertEqual(sectors.loc[direction, 'belowAbove'], ((reference <= 8.0).sum(), (reference > 8.0).sum()))
+
+class TestParseTimeStamps(unittest.TestCase):
+
+    def check(self, values, dateFormat):
+
+        expected = [datetime.datetime.strptime(value, dateFormat) for value in values]
+
+        self.assertEqual(list(parseTimeStamps(pd.Index(values), dateFormat)), expected)
+
+    def test_matches_strptime(self):
+
+        self.check(['07/10/2011 12:50', '29/02/2012 00:00', '7/1/2011 9:05', '31/12/1999 23:59'], '%d/%m/%Y %H:%M')
+        self.check(['11-10-07 12:50:30', '69-01-01 00:00:00'], '%y-%m-%d %H:%M:%S')
+        self.check(['Oct 07 2011 12:50PM', 'Jan 01 2012 01:10AM'], '%b %d %Y %I:%M%p')
+
+    def test_digits_only(self):
+
+        expected = [datetime.datetime(2016, 1, 1, 0, 0), datetime.datetime(2016, 1, 1, 0, 10)]
+
+        self.assertEqual(list(parseTimeStamps(pd.Index([201601010000, 201601010010]), '%Y%m%d%H%M')), expected)
+        self.assertEqual(list(parseTimeStamps(pd.Index(['201601010000', '201601010010']), '%Y%m%d%H%M')), expected)
+
+    def test_invalid_lines(self):
+
+        values = pd.Index(['07/10/2011 12:50', '29/02/2011 00:00', '07/10/2011 12:60'])
+
+        with self.assertRaisesRegexp(Exception, 'line\(s\): 3, 4'):
+            parseTimeStamps(values, '%d/%m/%Y %H:%M', firstLine = 2)
+
+class TestFilterDataFrame(unittest.TestCase):
+
+    def setUp(self):
+
+        random = np.random.RandomState(0)
+        rows = 1000
+
+        self.dataFrame = pd.DataFrame({'Speed': random.uniform(0.0, 20.0, rows),
+                                       'Power': random.uniform(-10.0, 2000.0, rows)},
+                                      index = pd.date_range('2016-01-01', periods = rows, freq = '10min'))
+
+        self.dataset = fixture['dataset']
+
+        self.dataFrame[self.dataset.timeStamp] = self.dataFrame.index
+        self.dataFrame.loc[self.dataFrame.index[::9], 'Speed'] = np.nan
+
+    def test_attribution(self):
+
+        below = Filter(True, 'Speed', 'Below', False, 4.0)
+        relationship = RelationshipFilter(True, 'AND', [Filter(True, 'Speed', 'Below', True, 8.0), Filter(True, 'Power', 'Below', False, 0.0)])
+        missing = Filter(True, 'Missing', 'Above', False, 1.0)
+
+        filtered = self.dataset.filterDataFrame(self.dataFrame, [below, relationship, missing])
+
+        belowMask = self.dataFrame['Speed'] < 4.0
+        relationshipMask = (self.dataFrame['Speed'] <= 8.0) & (self.dataFrame['Power'] < 0.0)
+
+        pd.util.testing.assert_frame_equal(filtered, self.dataFrame[~(belowMask | relationshipMask)])
+
+        self.assertEqual(below.removedAlone, belowMask.sum())
+        self.assertEqual(below.removedIncrementally, belowMask.sum())
+        self.assertEqual(relationship.removedAlone, relationshipMask.sum())
+        self.assertEqual(relationship.removedIncrementally, (relationshipMask & ~belowMask).sum())
+
+        self.assertTrue(below.applied and relationship.applied)
+        self.assertFalse(missing.applied)
+        self.assertIsNone(missing.removedAlone)
+
+    def test_time_of_day(self):
+
+        weekday = TimeOfDayFilter(True, datetime.datetime(2000, 1, 1, 8, 0), datetime.datetime(2000, 1, 1, 9, 0), [1, 7], [1])
+        night = TimeOfDayFilter(True, datetime.datetime(2000, 1, 1, 23, 0), datetime.datetime(2000, 1, 1, 1, 0), [1, 2, 3, 4, 5, 6, 7])
+
+        #periods are identified by their end time
+        start = self.dataFrame.index - datetime.timedelta(seconds = 600)
+        end = self.dataFrame.index
+
+        expected = np.array([(s.time() >= datetime.time(8, 0)) and (e.time() <= datetime.time(9, 0)) and (e.isoweekday() in [1, 7])
+                             for s, e in zip(start, end)])
+
+        np.testing.assert_array_equal(self.dataset.timeOfDayFilterMask(weekday, self.dataFrame), expected)
+
+        expected = np.array([(s.time() >= datetime.time(23, 0) or s.time() < datetime.time(1, 0)) and
+                             (e.time() > datetime.time(23, 0) or e.time() <= datetime.time(1, 0)) for s, e in zip(start, end)])
+
+        np.testing.assert_array_equal(self.dataset.timeOfDayFilterMask(night, self.dataFrame), expected)
+
+    def test_derived(self):
+
+        definition = [('Speed', 0.5, 1.0, 2.0), ('Power', '1', '10', '0.5')]
+
+        below = Filter(True, 'Power', 'Below', False, list(definition), derived = True)
+        above = Filter(True, 'Power', 'Above', True, list(definition), derived = True)
+
+        derived = ((self.dataFrame['Speed'] * 0.5 + 1.0) ** 2.0) * ((self.dataFrame['Power'] + 10.0) ** 0.5)
+        mask = (self.dataFrame['Power'] < derived) | (self.dataFrame['Power'] >= derived)
+
+        pd.util.testing.assert_frame_equal(self.dataset.filterDataFrame(self.dataFrame, [below, above]), self.dataFrame[~mask])
+
+        derivedColumns = {}
+        first = self.dataset.derivedColumn(self.dataFrame, definition, derivedColumns)
+        second = self.dataset.derivedColumn(self.dataFrame, [('Speed', '0.5', '1', '2'), ('Power', 1, 10, 0.5)], derivedColumns)
+
+        self.assertIs(first, second)
+        np.testing.assert_array_equal(first, derived.values)
+
+class TestExcludeData(unittest.TestCase):
+
+    def test_merge_intervals(self):
+
+        starts, ends = mergeIntervals(np.array([5, 1, 2, 10, 9, 20]), np.array([6, 3, 4, 12, 11, 19]))
+
+        self.assertEqual(list(starts), [1, 5, 9])
+        self.assertEqual(list(ends), [4, 6, 12])
+
+    def test_matches_scan(self):
+
+        timeStamps = pd.date_range('2016-01-01', periods = 500, freq = '10min')
+
+        dataset = fixture['dataset']
+
+        dataFrame = pd.DataFrame({dataset.timeStamp: timeStamps[np.random.RandomState(0).permutation(len(timeStamps))]})
+
+        exclusions = [Exclusion(datetime.datetime(2016, 1, 1, 2, 0), datetime.datetime(2016, 1, 1, 5, 0)),
+                      Exclusion(datetime.datetime(2016, 1, 1, 4, 0), datetime.datetime(2016, 1, 1, 6, 10)),
+                      Exclusion(datetime.datetime(2016, 1, 2, 0, 0), datetime.datetime(2016, 1, 2, 12, 0), active = False),
+                      Exclusion(datetime.datetime(2016, 1, 3, 0, 0), datetime.datetime(2016, 1, 2, 0, 0))]
+
+        config = DatasetConfiguration()
+        config.exclusions = exclusions
+
+        mask = pd.Series(True, index = dataFrame.index)
+
+        for exclusion in exclusions:
+            if exclusion.active:
+                mask &= ~((dataFrame[dataset.timeStamp] >= exclusion.startDate) & (dataFrame[dataset.timeStamp] <= exclusion.endDate))
+
+        pd.util.testing.assert_frame_equal(dataset.excludeData(dataFrame, config), dataFrame[mask])
+
+class TestAirDensity(unittest.TestCase):
+
+    def test_dry_air(self):
+
+        pressure = np.array([1013.25, 990.0, np.nan])
+        temperature = np.array([15.0, -5.0, 10.0])
+
+        np.testing.assert_array_equal(airDensity(pressure, temperature), 100.0 * pressure / (273.15 + temperature) / 287.058)
+        self.assertAlmostEqual(airDensity(1013.25, 15.0), 1.225, places = 3)
+
+    def test_humidity(self):
+
+        self.assertAlmostEqual(airDensity(1013.25, 15.0, 0.0), airDensity(1013.25, 15.0))
+        self.assertAlmostEqual(airDensity(1013.25, 15.0, 100.0), 1.2174, places = 4)
+
+        humid = airDensity(np.array([1013.25, 1013.25]), np.array([25.0, 25.0]), np.array([50.0, np.nan]))
+
+        self.assertLess(humid[0], airDensity(1013.25, 25.0))
+        self.assertTrue(np.isnan(humid[1]))
+
+class TestInputColumns(unittest.TestCase):
+
+    def setUp(self):
+
+        self.config = DatasetConfiguration(join(PACKAGE_ROOT, 'Data', 'Dataset 3 config.xml'))
+        self.analysisConfig = AnalysisConfiguration()
+        self.dataset = Dataset(self.config, self.analysisConfig)
+        self.header = self.dataset.read_header(self.config)
+
+    def test_projection(self):
+
+        self.config.filters.append(Filter(True, 'Hub Wind Speed', 'Below', False, 0.0))
+        self.config.filters.append(Filter(True, self.header[-1], 'Below', False, 0.0))
+
+        columns = self.dataset.input_columns(self.config, self.analysisConfig, self.header)
+
+        self.assertEqual(columns[0], self.config.timeStamp)
+        self.assertIn(self.config.hubWindSpeed, columns)
+        self.assertIn(self.header[-1], columns)
+        self.assertNotIn('Hub Wind Speed', columns)
+        self.assertTrue(set(columns) < set(self.header))
+
+    def test_missing_column(self):
+
+        self.config.hubTurbulence = 'Missing Turbulence'
+
+        with self.assertRaisesRegexp(Exception, 'Missing Turbulence'):
+            self.dataset.input_columns(self.config, self.analysisConfig, self.header)
+
+    def test_rews_profile_levels(self):
+
+        self.config.rewsProfileLevels.append(ShearMeasurement(150.0, 'Missing Speed'))
+
+        self.assertNotIn('Missing Speed', self.dataset.input_columns(self.config, self.analysisConfig, self.header))
+
+        self.analysisConfig.rewsActive = True
+
+        with self.assertRaisesRegexp(Exception, 'Missing Speed'):
+            self.dataset.input_columns(self.config, self.analysisConfig, self.header)
+
+if __name__ == '__main__':
+    unittest.main()
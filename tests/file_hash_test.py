@@ -0,0 +1,45 @@
+from pcwg.core import file_hash
+from pcwg.core.analysis import hash_file_contents
+import pandas as pd
+import unittest
+import tempfile
+import hashlib
+import shutil
+import os
+
+
+class TestFileHash(unittest.TestCase):
+
+    def setUp(self):
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.dat")
+
+        self.text = "a\tb\r\n1\t2\n 3\t4 \n" * 1000
+
+        with open(self.path, 'wb') as f:
+            f.write(self.text)
+
+        file_hash.memo.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_matches_whole_file_digests(self):
+
+        raw, stripped = file_hash.file_digests(self.path)
+
+        self.assertEqual(raw, hashlib.sha1(self.text).hexdigest())
+        self.assertEqual(stripped, hashlib.sha1(''.join(self.text.split())).hexdigest())
+        self.assertEqual(hash_file_contents(self.path), stripped)
+
+    def test_hashing_reader(self):
+
+        with file_hash.HashingReader(self.path) as reader:
+            dataFrame = pd.read_csv(reader, sep = '\t', nrows = 10)
+
+        self.assertEqual(len(dataFrame), 10)
+        self.assertEqual(file_hash.memo.values(), [(hashlib.sha1(self.text).hexdigest(), hashlib.sha1(''.join(self.text.split())).hexdigest())])
+
+if __name__ == '__main__':
+    unittest.main()
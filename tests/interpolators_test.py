@@ -1,4 +1,5 @@
 import pcwg.core.interpolators as interpolators
+import numpy as np
 import unittest
 
 from pcwg.core.binning import Bins
@@ -170,5 +171,35 @@ class TestMarmanderPowerCurveInterpolator(unittest.TestCase):
             print "{0:.2f}\t{1:.2f}\t{2:.2f}\t{3:.2f}%\t{4:.2f}%\t{5}".format(expectedX[i], expectedY[i], actual, (errorPercent * 100.0), (tolerancePercent * 100.0), match)
             self.assertTrue(match)
 
+class TestArrayEvaluation(unittest.TestCase):
+
+    x = [3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0, 10.0, 11.0, 12.0, 13.0, 14.0, 15.0]
+    y = [0.0, 50.0, 150.0, 300.0, 500.0, 800.0, 1100.0, 1400.0, 1600.0, 1700.0, 1750.0, 1750.0, 1750.0]
+
+    speeds = [np.nan, 0.0, 2.5, 3.0, 4.2, 7.7, 11.9, 12.0, 14.5, 15.0, 15.5, 30.0]
+
+    def assert_matches_scalar(self, interpolator):
+
+        powers = interpolator(np.array(self.speeds))
+
+        self.assertEqual(len(powers), len(self.speeds))
+
+        for i in range(len(self.speeds)):
+            expected = interpolator(self.speeds[i])
+            self.assertIsInstance(expected, float)
+            if np.isnan(expected):
+                self.assertTrue(np.isnan(powers[i]))
+            else:
+                self.assertAlmostEqual(powers[i], expected, places=9)
+
+    def test_cubic(self):
+        self.assert_matches_scalar(interpolators.CubicPowerCurveInterpolator(self.x, self.y, 14.0))
+
+    def test_linear(self):
+        self.assert_matches_scalar(interpolators.LinearPowerCurveInterpolator(self.x, self.y, 14.0))
+
+    def test_turbulence(self):
+        self.assert_matches_scalar(interpolators.LinearTurbulenceInterpolator(self.x, self.y))
+
 if __name__ == '__main__':
     unittest.main()
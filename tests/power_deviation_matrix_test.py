@@ -0,0 +1,68 @@
+from pcwg.core.power_deviation_matrix import AverageOfDeviationsMatrix, PowerDeviationMatrixDimension
+import numpy as np
+import pandas as pd
+import unittest
+
+
+class TestAverageOfDeviationsMatrix(unittest.TestCase):
+
+    def setUp(self):
+
+        random = np.random.RandomState(0)
+        rows = 2000
+
+        self.dataFrame = pd.DataFrame({'Speed': random.uniform(0.0, 20.0, rows),
+                                       'Turbulence': random.uniform(0.0, 0.3, rows),
+                                       'Deviation': random.normal(0.0, 0.05, rows)})
+
+        self.dataFrame.loc[::97, 'Deviation'] = np.nan
+
+        self.dimensions = [PowerDeviationMatrixDimension('Speed', 1.0, 1.0, 15),
+                           PowerDeviationMatrixDimension('Turbulence', 0.01, 0.02, 10)]
+
+        for dimension in self.dimensions:
+            self.dataFrame[dimension.bin_parameter] = dimension.create_column(self.dataFrame)
+
+    def test_matches_group_by(self):
+
+        minimum_count = 10
+
+        matrix = AverageOfDeviationsMatrix(self.dataFrame, 'Deviation', self.dimensions, minimum_count)
+
+        in_range = self.dataFrame[(self.dataFrame['Speed'] >= 0.5) & (self.dataFrame['Speed'] < 15.5) & (self.dataFrame['Turbulence'] < 0.2)]
+        grouped = in_range.groupby(['Speed (Bin)', 'Turbulence (Bin)'])['Deviation']
+
+        means = grouped.mean()
+        counts = grouped.count()
+
+        for (speed, turbulence), mean in means.iteritems():
+
+            count = counts[(speed, turbulence)]
+
+            self.assertEqual(matrix.count_matrix[speed][turbulence], count)
+            self.assertEqual(matrix.get_2D_count(speed, turbulence), count)
+
+            if count < minimum_count:
+                self.assertTrue(np.isnan(matrix.get_2D_value(speed, turbulence)))
+            else:
+                self.assertAlmostEqual(matrix.deviation_matrix[speed][turbulence], mean, places=12)
+
+    def test_unmatched_center(self):
+
+        matrix = AverageOfDeviationsMatrix(self.dataFrame, 'Deviation', self.dimensions)
+
+        self.assertRaises(Exception, matrix.get_2D_value, 1.5, 0.01)
+        self.assertRaises(Exception, matrix.get_2D_value, 16.0, 0.01)
+
+    def test_no_records_in_range(self):
+
+        self.dataFrame['Turbulence'] += 1.0
+        self.dataFrame['Turbulence (Bin)'] = self.dimensions[1].create_column(self.dataFrame)
+
+        matrix = AverageOfDeviationsMatrix(self.dataFrame, 'Deviation', self.dimensions)
+
+        self.assertEqual(matrix.counts.sum(), 0)
+        self.assertTrue(np.isnan(matrix.deviations).all())
+
+if __name__ == '__main__':
+    unittest.main()
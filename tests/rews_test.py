@@ -0,0 +1,70 @@
+import pcwg.core.rews as rews
+import pcwg.core.turbine as turbine
+import numpy as np
+import pandas as pd
+import unittest
+
+
+class TestRotorEquivalentWindSpeed(unittest.TestCase):
+
+    def setUp(self):
+
+        self.rotorGeometry = turbine.RotorGeometry(90.0, 80.0, tilt = 5.0)
+
+        heights = [30.0, 50.0, 80.0, 110.0, 130.0]
+
+        speedLevels = dict((height, "Speed {0}".format(height)) for height in heights)
+        directionLevels = dict((height, "Direction {0}".format(height)) for height in heights)
+        upflowLevels = dict((height, "Upflow {0}".format(height)) for height in heights)
+
+        self.profileLevels = rews.ProfileLevels(self.rotorGeometry, speedLevels, directionLevels, upflowLevels)
+
+        random = np.random.RandomState(0)
+        rows = 50
+
+        data = {}
+
+        for height in heights:
+            data[speedLevels[height]] = random.uniform(3.0, 15.0, rows) * (height / 80.0) ** 0.2
+            data[directionLevels[height]] = (350.0 + height * 0.2 + random.uniform(-10.0, 10.0, rows)) % 360.0
+            data[upflowLevels[height]] = random.uniform(-0.5, 0.5, rows)
+
+        self.dataFrame = pd.DataFrame(data)
+
+    def assert_matches_row_wise(self, rotor, hubWindSpeedCalculator):
+
+        rotorEquivalentWindSpeed = rews.RotorEquivalentWindSpeed(self.profileLevels, rotor, hubWindSpeedCalculator, True, True, 3.0)
+
+        expected = self.dataFrame.apply(rotorEquivalentWindSpeed.rewsToHubRatio, axis=1)
+        actual = rotorEquivalentWindSpeed.rewsToHubRatios(self.dataFrame)
+
+        np.testing.assert_allclose(actual, expected.values, rtol = 1e-12)
+
+    def test_evenly_spaced_rotor(self):
+        self.assert_matches_row_wise(rews.EvenlySpacedRotor(self.rotorGeometry, 5),
+                                     rews.InterpolatedHubWindSpeed(self.profileLevels, self.rotorGeometry))
+
+    def test_profile_levels_rotor(self):
+        self.assert_matches_row_wise(rews.ProfileLevelsRotor(self.rotorGeometry, self.profileLevels),
+                                     rews.PiecewiseExponentHubWindSpeed(self.profileLevels, self.rotorGeometry))
+
+class TestProfileInterpolation(unittest.TestCase):
+
+    def setUp(self):
+
+        self.dataFrame = pd.DataFrame({'Speed 40': [6.0, 8.0], 'Speed 60': [7.0, 9.0], 'Speed 80': [8.0, 11.0]})
+
+    def test_missing_columns_ignored(self):
+
+        interpolation = rews.ProfileInterpolation({40.0: 'Speed 40', 60.0: 'Speed 60', 70.0: None, 80.0: 'Speed 80'}, [50.0, 70.0])
+
+        np.testing.assert_allclose(interpolation(self.dataFrame), [[6.5, 7.5], [8.5, 10.0]])
+
+    def test_insufficient_levels(self):
+
+        interpolation = rews.ProfileInterpolation({40.0: 'Speed 40', 60.0: None, 80.0: 'Speed 80'}, [50.0])
+
+        self.assertIsNone(interpolation(self.dataFrame))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from pcwg.core.time_series_cache import TimeSeriesCache
+from pcwg.core import file_hash
+import pandas as pd
+import cPickle as pickle
+import unittest
+import tempfile
+import shutil
+import os
+
+
+class TestTimeSeriesCache(unittest.TestCase):
+
+    def setUp(self):
+
+        self.active = TimeSeriesCache.Active
+        TimeSeriesCache.Active = True
+
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "data.dat")
+
+        self.write("a\tb\n1\t2\n")
+
+        self.settings = {'separator': 'TAB', 'badData': -99.99}
+        self.dataFrame = pd.DataFrame({'a': [1.0], 'b': [2.0]})
+
+    def tearDown(self):
+        TimeSeriesCache.Active = self.active
+        shutil.rmtree(self.directory)
+
+    def write(self, text):
+        with open(self.path, 'w') as f:
+            f.write(text)
+
+    def test_round_trip(self):
+
+        TimeSeriesCache(self.path, self.settings).save(self.dataFrame)
+
+        pd.util.testing.assert_frame_equal(TimeSeriesCache(self.path, self.settings).load(), self.dataFrame)
+
+    def test_invalidated_by_settings(self):
+
+        TimeSeriesCache(self.path, self.settings).save(self.dataFrame)
+
+        self.assertIsNone(TimeSeriesCache(self.path, {'separator': 'COMMA', 'badData': -99.99}).load())
+
+    def test_invalidated_by_contents(self):
+
+        cache = TimeSeriesCache(self.path, self.settings)
+        cache.save(self.dataFrame)
+
+        stat = os.stat(self.path)
+        self.write("a\tb\n1\t3\n")
+        os.utime(self.path, (stat.st_atime, stat.st_mtime))
+
+        #a later run starts without the digests memoised by this process
+        file_hash.memo.clear()
+
+        self.assertIsNone(cache.load())
+
+    def test_time_stamp_index(self):
+
+        self.dataFrame.index = pd.DatetimeIndex(['2016-01-01 00:10'], name = 'Time Stamp')
+
+        TimeSeriesCache(self.path, self.settings).save(self.dataFrame)
+
+        pd.util.testing.assert_frame_equal(TimeSeriesCache(self.path, self.settings).load(), self.dataFrame)
+
+    def test_pickle_rejected(self):
+
+        cache = TimeSeriesCache(self.path, self.settings)
+
+        with open(cache.cache_path, 'wb') as f:
+            pickle.dump(self.dataFrame, f, pickle.HIGHEST_PROTOCOL)
+
+        self.assertIsNone(cache.load())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+import pcwg.core.turbine as turbine
+import numpy as np
+import unittest
+
+
+class TestSimulatedPowerLookup(unittest.TestCase):
+
+    def setUp(self):
+
+        integrationRange = turbine.IntegrationRange(0.0, 100.0, 0.1)
+        availablePower = turbine.AvailablePower(turbine.RotorGeometry(90.0, 80.0).area, 1.225)
+        zeroTurbulencePowerCurve = turbine.InitialZeroTurbulencePowerCurveIteration(integrationRange.windSpeeds, availablePower, 2000.0, 3.5, 0.45)
+
+        self.simulatedPower = turbine.SimulatedPower(zeroTurbulencePowerCurve, integrationRange)
+        self.lookup = turbine.SimulatedPowerLookup(self.simulatedPower, 0.1, 0.005, 30.0, 0.5)
+
+    def test_matches_exact_integral(self):
+
+        windSpeeds = np.array([3.0, 5.23, 7.777, 9.91, 11.04, 14.5, 24.95])
+        turbulences = np.array([0.05, 0.083, 0.1, 0.127, 0.16, 0.2, 0.31])
+
+        exact = self.simulatedPower.power(windSpeeds, turbulences)
+        interpolated = self.lookup.power(windSpeeds, turbulences)
+
+        self.assertLessEqual(self.lookup.maximumError, 5.0)
+
+        for i in range(len(windSpeeds)):
+            self.assertAlmostEqual(interpolated[i], exact[i], delta=self.lookup.maximumError)
+            self.assertAlmostEqual(self.lookup.power(windSpeeds[i], turbulences[i]), self.simulatedPower.power(windSpeeds[i], turbulences[i]), delta=self.lookup.maximumError)
+
+    def test_off_grid_uses_exact_integral(self):
+
+        windSpeeds = np.array([35.0, 8.0, 0.05, np.nan])
+        turbulences = np.array([0.1, 0.6, 0.1, 0.1])
+
+        exact = self.simulatedPower.power(windSpeeds, turbulences)
+        interpolated = self.lookup.power(windSpeeds, turbulences)
+
+        np.testing.assert_array_equal(interpolated, exact)
+
+if __name__ == '__main__':
+    unittest.main()